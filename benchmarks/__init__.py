@@ -0,0 +1 @@
+"""Benchmarks of pychemist; see benchmarks/suite.py for the full suite."""
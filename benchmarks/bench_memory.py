@@ -0,0 +1,98 @@
+"""
+Peak memory (RSS) of the .chem accessor methods in copy and in-place mode on a wide frame.
+
+Every measurement runs in a fresh Python process, so the peaks don't influence each other.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_memory [--rows 200000] [--columns 500]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+import pychemist  # noqa: F401 (registers the .chem accessor)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = {
+    'mutate': lambda df, inplace: df.chem.mutate("year >= 2010", 'c0', 0.0, inplace=inplace),
+    'lag': lambda df, inplace: df.chem.lag(['c0', 'c1'], 'ticker', 'year', inplace=inplace),
+    'lead': lambda df, inplace: df.chem.lead(['c0', 'c1'], 'ticker', 'year', [1, 2], inplace=inplace),
+}
+
+
+def rss_mb():
+    """Current resident set size in MB."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2 ** 20
+
+
+def reset_peak():
+    """Reset the peak RSS counter of this process (Linux only); returns False if unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_mb():
+    """Peak resident set size in MB since the last reset."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_wide_frame(rows, columns, periods=20, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(rows, columns)), columns=[f'c{i}' for i in range(columns)], copy=False)
+    df.insert(0, 'year', np.tile(np.arange(2000, 2000 + periods), rows // periods + 1)[:rows])
+    df.insert(0, 'ticker', np.repeat(np.arange(rows // periods + 1), periods)[:rows])
+    return df
+
+
+def child(operation, mode, rows, columns):
+    df = make_wide_frame(rows, columns)
+    before = rss_mb()
+    reset_peak()
+    result = OPERATIONS[operation](df, mode == 'inplace')
+    print(json.dumps({'operation': operation, 'mode': mode, 'frame_mb': df.memory_usage(deep=True).sum() / 2 ** 20,
+                      'extra_peak_mb': peak_mb() - before}))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=500)
+    parser.add_argument("--child", nargs=2, metavar=("OPERATION", "MODE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.rows, args.columns)
+        return
+
+    print(f"{'operation':>10} {'mode':>8} {'frame MB':>10} {'extra peak MB':>14}")
+    for operation in OPERATIONS:
+        for mode in ['copy', 'inplace']:
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_memory", "--rows", str(args.rows),
+                                  "--columns", str(args.columns), "--child", operation, mode],
+                                 cwd=ROOT, capture_output=True, text=True, check=True)
+            result = json.loads(out.stdout)
+            print(f"{operation:>10} {mode:>8} {result['frame_mb']:>10,.0f} {result['extra_peak_mb']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
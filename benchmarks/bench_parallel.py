@@ -0,0 +1,64 @@
+"""
+Scaling of the .chem panel operations with the number of worker processes (`n_jobs`).
+
+Usage:
+    python benchmarks/bench_parallel.py [--rows 10000000] [--jobs 1 2 4 8] [--repeat 3]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import pychemist  # noqa: F401 (registers the .chem accessor)
+
+OPERATIONS = {
+    'lag': lambda df, n_jobs: df.chem.lag(['x0', 'x1'], 'ticker', 'year', [1, 2], n_jobs=n_jobs),
+    'rolling': lambda df, n_jobs: df.chem.rolling(['x0', 'x1'], 'ticker', 'year', window=3, stats=['mean', 'std'],
+                                                  n_jobs=n_jobs),
+}
+
+
+def make_panel(rows, periods=20, gap_rate=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = rows // periods
+    df = pd.DataFrame({'ticker': np.repeat(np.arange(ids), periods), 'year': np.tile(np.arange(2000, 2000 + periods), ids)})
+    df = df[rng.random(len(df)) >= gap_rate]
+    for i in range(2):
+        df[f'x{i}'] = rng.normal(size=len(df))
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_panel(args.rows)
+    print(f"{len(df):,} rows, {cpus} CPUs")
+    print(f"{'operation':>10} {'n_jobs':>7} {'seconds':>9} {'speedup':>8}")
+    for name, operation in OPERATIONS.items():
+        serial = best_of(lambda: operation(df, None), args.repeat)
+        print(f"{name:>10} {'serial':>7} {serial:>9.2f} {1:>7.1f}x")
+        for n_jobs in args.jobs:
+            if n_jobs == 1:
+                continue
+            seconds = best_of(lambda: operation(df, n_jobs), args.repeat)
+            print(f"{name:>10} {n_jobs:>7} {seconds:>9.2f} {serial / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
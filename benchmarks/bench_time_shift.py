@@ -0,0 +1,62 @@
+"""
+Throughput of `pychemist.time_shift` against the hash merge it replaced.
+
+Usage:
+    python benchmarks/bench_time_shift.py [--rows 100000 1000000] [--repeat 3]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pychemist import time_shift
+
+
+def merge_shift(dataframe, variables, id, time, shift=1):
+    # The previous implementation of time_shift: a left merge on a shifted copy of the panel
+    suffix = f'_lag{shift}' if shift > 1 else '_lag'
+    df_lag = dataframe[[time] + [id] + variables].copy()
+    df_lag[time] = df_lag[time] + shift
+    return pd.merge(dataframe, df_lag, how="left", left_on=[id, time], right_on=[id, time], suffixes=['', suffix])
+
+
+def make_panel(rows, periods=20, gap_rate=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = rows // periods
+    df = pd.DataFrame({
+        'ticker': np.repeat(np.arange(ids), periods).astype(str),
+        'year': np.tile(np.arange(2000, 2000 + periods), ids),
+    })
+    df = df[rng.random(len(df)) >= gap_rate]
+    for i in range(3):
+        df[f'x{i}'] = rng.normal(size=len(df))
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    variables = ['x0', 'x1', 'x2']
+    print(f"{'rows':>12} {'merge rows/s':>15} {'shift rows/s':>15} {'speedup':>8}")
+    for rows in args.rows:
+        df = make_panel(rows)
+        merge = best_of(lambda: merge_shift(df, variables, 'ticker', 'year'), args.repeat)
+        shift = best_of(lambda: time_shift(df, variables, 'ticker', 'year'), args.repeat)
+        print(f"{len(df):>12,} {len(df) / merge:>15,.0f} {len(df) / shift:>15,.0f} {merge / shift:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
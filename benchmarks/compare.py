@@ -0,0 +1,52 @@
+"""
+Compare two result files of `benchmarks.suite`, e.g. of two commits.
+
+Usage (from the repository root):
+    python -m benchmarks.compare before.json after.json [--threshold 0.1]
+"""
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data['metadata'], {(result['benchmark'], result['rows']): result for result in data['results']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown or memory increase reported as a regression (default 10%%)")
+    args = parser.parse_args()
+
+    before_info, before = load_results(args.before)
+    after_info, after = load_results(args.after)
+    print(f"before: {before_info.get('commit')}  after: {after_info.get('commit')}")
+    print(f"{'benchmark':>14} {'rows':>12} {'time before':>12} {'time after':>11} {'ratio':>7} "
+          f"{'MB before':>10} {'MB after':>9}")
+
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        ratio = new['seconds'] / old['seconds'] if old['seconds'] else float('inf')
+        slower = ratio > 1 + args.threshold
+        # Memory peaks below a few MB are noise
+        heavier = new['peak_mb'] > max(old['peak_mb'] * (1 + args.threshold), old['peak_mb'] + 5)
+        regressions += slower or heavier
+        flag = "  <- " + ", ".join(label for label, hit in [("slower", slower), ("more memory", heavier)] if hit) \
+            if slower or heavier else ""
+        print(f"{key[0]:>14} {key[1]:>12,} {old['seconds']:>12.4f} {new['seconds']:>11.4f} {ratio:>6.2f}x "
+              f"{old['peak_mb']:>10.1f} {new['peak_mb']:>9.1f}{flag}")
+
+    missing = sorted(before.keys() ^ after.keys())
+    if missing:
+        print("Only in one file: " + ", ".join(f"{name} ({rows:,})" for name, rows in missing))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
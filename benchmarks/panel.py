@@ -0,0 +1,85 @@
+"""
+Synthetic panel data for the benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+DTYPES = ["float64", "float32", "int64", "Int64", "bool", "category"]
+
+
+def make_panel(ids, periods, *, gap_rate=0.05, duplicate_rate=0.0, variables=3, dtypes=("float64",),
+               string_ids=True, shuffle=True, seed=0):
+    """
+    Generate a (ticker, year) panel with random variables.
+
+    Parameters:
+    ----------
+    ids : int
+        The number of units (tickers).
+
+    periods : int
+        The number of years per unit, before gaps are removed.
+
+    gap_rate : float, default=0.05
+        The share of (ticker, year) rows that is dropped, leaving gaps in the panel.
+
+    duplicate_rate : float, default=0.0
+        The share of rows that is repeated, creating duplicate (ticker, year) keys.
+
+    variables : int, default=3
+        The number of variables `v0`, `v1`, ...
+
+    dtypes : sequence of str, default=("float64",)
+        The dtypes of the variables, cycled over `v0`, `v1`, ...: any of "float64", "float32",
+        "int64", "Int64" (with 5% missing values), "bool" and "category".
+
+    string_ids : bool, default=True
+        Whether the tickers are strings (True) or integers (False).
+
+    shuffle : bool, default=True
+        Whether to shuffle the rows, instead of sorting them by (ticker, year).
+
+    seed : int, default=0
+        The random seed.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        The columns `ticker`, `year`, `treated` (0/1), `y`, `x` (float) and the variables.
+    """
+    rng = np.random.default_rng(seed)
+    ticker = np.repeat(np.arange(ids), periods)
+    year = np.tile(np.arange(2000, 2000 + periods), ids)
+    keep = rng.random(len(ticker)) >= gap_rate
+    ticker, year = ticker[keep], year[keep]
+    if duplicate_rate > 0:
+        repeat = np.flatnonzero(rng.random(len(ticker)) < duplicate_rate)
+        ticker, year = np.concatenate([ticker, ticker[repeat]]), np.concatenate([year, year[repeat]])
+
+    n = len(ticker)
+    df = pd.DataFrame({'ticker': ticker.astype(str) if string_ids else ticker, 'year': year})
+    df['treated'] = (ticker % 2).astype(np.int64)
+    df['x'] = rng.normal(size=n)
+    df['y'] = 0.5 * df['x'] + 0.2 * df['treated'] + rng.normal(size=n)
+    for i in range(variables):
+        dtype = dtypes[i % len(dtypes)]
+        if dtype not in DTYPES:
+            raise ValueError(f"Unknown dtype '{dtype}'; choose from {', '.join(DTYPES)}.")
+        if dtype in ("float64", "float32"):
+            values = rng.normal(size=n).astype(dtype)
+        elif dtype == "int64":
+            values = rng.integers(0, 1000, size=n)
+        elif dtype == "Int64":
+            values = pd.array(rng.integers(0, 1000, size=n), dtype="Int64")
+            values[rng.random(n) < 0.05] = pd.NA
+        elif dtype == "bool":
+            values = rng.random(n) < 0.5
+        else:
+            values = pd.Categorical.from_codes(rng.integers(0, 10, size=n), [f"c{j}" for j in range(10)])
+        df[f'v{i}'] = values
+
+    if shuffle:
+        df = df.iloc[rng.permutation(n)]
+    else:
+        df = df.sort_values(['ticker', 'year'], kind='stable')
+    return df.reset_index(drop=True)
@@ -0,0 +1,179 @@
+"""
+Wall time and peak memory of the public pychemist functions on synthetic panels, saved as JSON.
+
+Every (benchmark, size) pair runs in a fresh Python process, so memory peaks don't influence each
+other. Compare the results of two commits with `python -m benchmarks.compare`.
+
+Usage (from the repository root):
+    python -m benchmarks.suite [--rows 10000 100000 1000000] [--only lag mutate] [--output results.json]
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import importlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import pychemist
+from .bench_memory import peak_mb, reset_peak, rss_mb
+from .panel import DTYPES, make_panel
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VARIABLES = ['v0', 'v1', 'v2']
+
+
+def frame(df, workdir, args):
+    return df
+
+
+def registered_dataset(df, workdir, args):
+    path = os.path.join(workdir, "panel.parquet")
+    df.to_parquet(path, index=False)
+    pychemist.datasets.register("benchmark", path)
+    return "benchmark"
+
+
+def cached_dataset(df, workdir, args):
+    name = registered_dataset(df, workdir, args)
+    pychemist.load(name)
+    return name
+
+
+def fitted_model(df, workdir, args):
+    import statsmodels.formula.api as smf
+
+    tickers = df['ticker'].drop_duplicates().iloc[:args.fe_levels]
+    return smf.ols("y ~ x + C(ticker)", df[df['ticker'].isin(tickers)]).fit()
+
+
+def quiet_ttest(df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        pychemist.ttest(df, 'y', 'treated')
+
+
+# name: (setup, benchmarked function of the setup result)
+BENCHMARKS = {
+    'time_shift': (frame, lambda df: pychemist.time_shift(df, VARIABLES, 'ticker', 'year')),
+    'lag': (frame, lambda df: df.chem.lag(VARIABLES, 'ticker', 'year', [1, 2])),
+    'lead': (frame, lambda df: df.chem.lead(VARIABLES, 'ticker', 'year')),
+    'mutate': (frame, lambda df: pychemist.mutate(df, "year >= 2010 & treated == 1", 'x', 0.0)),
+    'winsorize': (frame, lambda df: df.chem.winsorize(VARIABLES, by='year')),
+    'standardize': (frame, lambda df: df.chem.standardize(VARIABLES, by='year')),
+    'ttest': (frame, quiet_ttest),
+    'ttest_table': (frame, lambda df: pychemist.ttest_table(df, ['x', 'y'], 'treated')),
+    'ttest_perm': (frame, lambda df: pychemist.ttest_table(df, 'y', 'treated', method='permutation',
+                                                            n_resamples=1000, seed=0)),
+    'load': (registered_dataset, lambda name: pychemist.load(name, cache=False)),
+    'load_cached': (cached_dataset, lambda name: pychemist.load(name)),
+    'summary_no_fe': (fitted_model, lambda model: pychemist.summary_no_fe(model)),
+}
+
+
+def panel_arguments(args, rows):
+    return dict(ids=max(rows // args.periods, 1), periods=args.periods, gap_rate=args.gap_rate,
+                duplicate_rate=args.duplicate_rate, variables=args.variables, dtypes=args.dtypes,
+                string_ids=not args.int_ids, seed=args.seed)
+
+
+def child(args):
+    name, rows = args.child[0], int(args.child[1])
+    setup, run = BENCHMARKS[name]
+    df = make_panel(**panel_arguments(args, rows))
+    frame_mb = df.memory_usage(deep=True).sum() / 2 ** 20
+    with tempfile.TemporaryDirectory() as workdir:
+        state = setup(df, workdir, args)
+        if setup is not frame:
+            del df
+        # Import the lazily loaded modules up front, so that import time isn't measured
+        for module in ('stats', 'regression', 'loader'):
+            importlib.import_module(f'pychemist.{module}')
+        gc.collect()
+        before = rss_mb()
+        reset_peak()
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - start)
+        peak = peak_mb() - before
+    print(json.dumps({'benchmark': name, 'rows': rows, 'seconds': min(timings), 'timings': timings,
+                      'peak_mb': peak, 'frame_mb': frame_mb}))
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'pychemist': pychemist.__version__,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'cpus': os.cpu_count(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'panel': {key: value for key, value in panel_arguments(args, 0).items() if key != 'ids'},
+        'repeat': args.repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e4, 1e5, 1e6],
+                        help="panel sizes, up to 1e8 (before gaps and duplicates)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--periods", type=int, default=20)
+    parser.add_argument("--gap-rate", type=float, default=0.05)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--variables", type=int, default=3)
+    parser.add_argument("--dtypes", nargs="+", choices=DTYPES, default=["float64"])
+    parser.add_argument("--int-ids", action="store_true", help="integer instead of string tickers")
+    parser.add_argument("--fe-levels", type=int, default=500, help="fixed-effect levels in the summary_no_fe model")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file (default: benchmark-<commit>.json)")
+    parser.add_argument("--child", nargs=2, metavar=("BENCHMARK", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.variables < len(VARIABLES):
+        parser.error(f"--variables needs to be at least {len(VARIABLES)}")
+
+    if args.child:
+        child(args)
+        return
+
+    forwarded = sys.argv[1:]
+    info = metadata(args)
+    results = []
+    print(f"{'benchmark':>14} {'rows':>12} {'seconds':>10} {'peak MB':>9}")
+    for rows in [int(rows) for rows in args.rows]:
+        for name in args.only:
+            out = subprocess.run([sys.executable, "-m", "benchmarks.suite", *forwarded, "--child", name, str(rows)],
+                                 cwd=ROOT, capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{name:>14} {rows:>12,} failed: {out.stderr.strip().splitlines()[-1]}")
+                continue
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{name:>14} {rows:>12,} {result['seconds']:>10.4f} {result['peak_mb']:>9.1f}")
+
+    output = args.output or f"benchmark-{(info['commit'] or 'unknown')[:10]}.json"
+    with open(output, "w") as f:
+        json.dump({'metadata': info, 'results': results}, f, indent=2)
+    print(f"Saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,48 @@
+import numpy as np
 import pandas as pd
 import warnings
-from scipy.stats import ttest_ind
-import importlib.resources
+import importlib
 from .version import __version__
-
-datasets = [
-    "financials"
-]
-
-def load(name: str) -> pd.DataFrame:
-    if name in datasets:
-        with importlib.resources.files("pychemist.data").joinpath(f"{name}.parquet").open("rb") as f:
-            return pd.read_parquet(f)
-    else:
-        raise ValueError(f"Dataset '{name}' does not exist.")
-
+from .panel import PanelIndex, shift_columns, shift_frame, rolling_columns, ROLLING_STATS, get_declared_panel, set_declared_panel
+from .panel import _shift_suffix, _shift_list
+from ._compat import safe_copy, concat_columns
+from .expressions import ExpressionCache, expression_cache
+from .parallel import shift_indexer, rolling_columns_parallel
+from .profiling import Profile, instrumented, phase
+from .pipes import split_pipe, _split_tokens, SPLIT_OUTPUTS
+from .lazy import LazyFrame
+from .grouped import group_codes, winsorize_columns, standardize_columns
+
+# Modules that import scipy, statsmodels or pyarrow are only imported on first use of one of their
+# names, so that `import pychemist` (and the .chem accessor) stays fast.
+_LAZY_ATTRIBUTES = {
+    "ttest": ".stats",
+    "ttest_table": ".stats",
+    "TTestAccumulator": ".stats",
+    "summary_no_fe": ".regression",
+    "ols_fe": ".regression",
+    "AbsorbedOLSResults": ".regression",
+    "time_shift_parquet": ".parquet",
+    "datasets": ".loader",
+    "load": ".loader",
+    "DatasetRegistry": ".loader",
+    "TableCache": ".loader",
+    "table_cache": ".loader",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+@instrumented("time_shift")
 def time_shift(dataframe, variables, id, time, shift=1):
     """
     Creates lagged or lead variables for the specified variables in the time series data.
@@ -62,60 +90,35 @@ def time_shift(dataframe, variables, id, time, shift=1):
     if shift == 0:
         raise Exception("Shift value cannot be equal to 0, as it would not change the data.")
     
-    df_lag = dataframe[[time] + [id] + variables].copy()
-    df_lag[time] = df_lag[time] + shift
-
     # Handle suffixes for lag/lead columns
-    if shift > 0:  # Lag
-        suffix = f'_lag{shift}' if shift > 1 else '_lag'
-    elif shift < 0:  # Lead
-        suffix = f'_lead{abs(shift)}' if abs(shift) > 1 else '_lead'
-    
-    # Identify the new columns that will be created (for the conflict check)
-    new_columns = [var + suffix for var in variables]
+    suffix = _shift_suffix(shift)
+
+    with phase("conflict check"):
+        # Identify the new columns that will be created (for the conflict check)
+        new_columns = [var + suffix for var in variables]
 
-    # Check if any of the new columns already exist in the dataframe
-    conflict_columns = [col for col in new_columns if col in dataframe.columns]
+        # Check if any of the new columns already exist in the dataframe
+        conflict_columns = [col for col in new_columns if col in dataframe.columns]
     
     if conflict_columns:
         raise ValueError(f"The following lag/lead columns already exist: {', '.join(conflict_columns)}")
     
-    # Perform the merge if no conflicts
-    df_merged = pd.merge(dataframe, df_lag, how="left", left_on=[id, time], right_on=[id, time], suffixes=['', suffix])
-
-    return df_merged
+    # Look up the shifted values positionally if no conflicts
+    with phase("index"):
+        panel = PanelIndex(dataframe[id], dataframe[time])
+    return shift_frame(dataframe, variables, panel, [shift], [suffix])
 
 def convert_pipe_list(x):
+    """
+    Split a single string such as "1|2|3" into a list of integers (or strings, if not all elements
+    are integers). Use `split_pipe` or `df.chem.split_pipe` to split a whole column at once.
+    """
     try:
         return [int(i) for i in x.split("|") if i]
     except:
         return [i for i in x.split("|") if i]
 
-def ttest(dataframe,variable,treatment):
-    """
-    Input: variable to test, and group variable, dataframe
-    Print variable name, mean treatment group (1), mean base group (0), difference between groups, t-value and significance
-    """
-    group1=dataframe[dataframe[treatment]==1]
-    group0=dataframe[dataframe[treatment]==0]
-    t,p=ttest_ind(group1[variable], group0[variable])
-    diff=(group1[variable].mean()-group0[variable].mean())
-    print(f"T-test for {variable}, grouped by {treatment}:\n")
-    print(f"Mean for {treatment} (1): {group1[variable].mean():.3f}")
-    print(f"Mean for {treatment} (0): {group0[variable].mean():.3f}\n")
-    print(f"Difference: {diff:.3f}")
-    print(f"T-value: {t:.3f}")
-    print(f"Signficance: {p:.3f}")
-
-def summary_no_fe(model):
-    summary_str = model.summary().as_text()
-
-    # Filter out lines that start with 'C(' (for fixed effects)
-    filtered_summary = "\n".join([line for line in summary_str.split('\n') if not line.startswith('C(')])
-
-    # Print the filtered summary
-    return filtered_summary
-
+@instrumented("mutate")
 def mutate(dataframe, query_str, column, value, other=None, *, inplace=False):
     """
     Conditionally update values in a DataFrame column based on a query string.
@@ -129,12 +132,16 @@ def mutate(dataframe, query_str, column, value, other=None, *, inplace=False):
     query_str : str
         A pandas query string defining the condition for rows to update.
     value : scalar or array-like
-        The new value(s) to assign to rows where the condition is True.
+        The new value(s) to assign to rows where the condition is True. Array-like values need
+        one entry per matching row or one entry per row (Series are aligned on the index). A value
+        of another type than `column` upcasts the column (e.g. to object) instead of raising.
     other : scalar or array-like, optional
-        The new value(s) to assign to rows where the condition is False.	
+        The new value(s) to assign to rows where the condition is False, with one entry per
+        non-matching row or one entry per row if array-like.
     inplace : bool, default False
         If True, modify the DataFrame in place and return None.
-        If False, return a modified copy of the DataFrame.
+        If False, return a modified copy of the DataFrame. Under pandas Copy-on-Write, the copy
+        only allocates memory for `column`; the other columns are shared with `dataframe`.
 
     Returns:
     --------
@@ -145,19 +152,123 @@ def mutate(dataframe, query_str, column, value, other=None, *, inplace=False):
     if not isinstance(inplace, bool):
         raise TypeError(f"'inplace' must be a bool, got {type(inplace).__name__}")
 
-    df = dataframe if inplace else dataframe.copy()
+    with phase("copy"):
+        df = dataframe if inplace else safe_copy(dataframe)
 
-    match_idx = df.query(query_str).index
-    non_match_idx = df.index.difference(match_idx)
+    with phase("condition"):
+        mask = _condition_mask(df, query_str)
 
+    # Build the new column in one vectorized pass and assign it once
+    with phase("assign"):
+        current = df[column] if column in df else pd.Series(np.nan, index=df.index)
+        if other is not None:
+            current = current.where(mask, _scatter(other, ~mask, "other"))
+        df[column] = current.mask(mask, _scatter(value, mask, "value"))
 
-    df.loc[match_idx, column] = value
-    if other is not None:
-        df.loc[non_match_idx, column] = other
+    if not inplace:
+        return df
+
+@instrumented("case_when")
+def case_when(dataframe, column, caselist, default=None, *, inplace=False):
+    """
+    Set a DataFrame column from a list of conditions, in one pass.
+
+    The conditions are checked in order and every row gets the value of the first condition it
+    meets, like a SQL `CASE WHEN` statement. This replaces a chain of `mutate` calls.
+
+    Parameters:
+    -----------
+    dataframe : pd.DataFrame
+        The DataFrame to update.
+    column : str
+        The name of the column to update or create.
+    caselist : list of tuple
+        A list of (query_str, value) pairs. `query_str` is a pandas query string defining the condition,
+        `value` the scalar or array-like value(s) to assign to the rows where it is True. Array-like
+        values need one entry per matching row or one entry per row (Series are aligned on the index).
+        A value of another type than `column` upcasts the column (e.g. to object) instead of raising.
+    default : scalar or array-like, optional
+        The value(s) to assign to rows that meet none of the conditions, with one entry per such row or
+        one entry per row if array-like. If None, these rows keep their current values (or get missing
+        values if `column` is created).
+    inplace : bool, default False
+        If True, modify the DataFrame in place and return None.
+        If False, return a modified copy of the DataFrame. Under pandas Copy-on-Write, the copy
+        only allocates memory for `column`; the other columns are shared with `dataframe`.
+
+    Returns:
+    --------
+    pd.DataFrame or None
+        Returns the modified copy if `inplace=False`, otherwise returns None.
+    """
+
+    if not isinstance(inplace, bool):
+        raise TypeError(f"'inplace' must be a bool, got {type(inplace).__name__}")
+
+    if not isinstance(caselist, list) or not all(isinstance(case, tuple) and len(case) == 2 for case in caselist):
+        raise TypeError("The 'caselist' argument must be a list of (query_str, value) tuples.")
+
+    with phase("copy"):
+        df = dataframe if inplace else safe_copy(dataframe)
+
+    with phase("condition"):
+        masks = [_condition_mask(df, query_str) for query_str, _ in caselist]
+
+    with phase("assign"):
+        if default is not None:
+            # The default is scattered into the rows that meet none of the conditions
+            unmatched = ~np.logical_or.reduce(masks) if masks else np.ones(len(df), dtype=bool)
+            current = pd.Series(_scatter(default, unmatched, "default"), index=df.index)
+        elif column in df:
+            current = df[column]
+        else:
+            current = pd.Series(np.nan, index=df.index)
+
+        # Apply the conditions from last to first, so that the first matching condition wins
+        for mask, (_, value) in zip(reversed(masks), reversed(caselist)):
+            current = current.mask(mask, _scatter(value, mask, "value"))
+        df[column] = current
 
     if not inplace:
         return df
 
+def _condition_mask(dataframe, query_str):
+    """
+    Evaluate a pandas query string to a boolean numpy array with one entry per row.
+    Missing results count as False, as in `DataFrame.query`. The compiled expression is cached in
+    `expression_cache`.
+    """
+    result = expression_cache.evaluate(dataframe, query_str)
+    if np.ndim(result) == 0:
+        result = np.full(len(dataframe), result)
+    result = pd.Series(result)
+    if not (pd.api.types.is_bool_dtype(result.dtype) or result.dtype == object):
+        raise ValueError(f"The query string `{query_str}` needs to evaluate to a boolean condition.")
+    return result.fillna(False).to_numpy(dtype=bool)
+
+def _scatter(value, mask, name):
+    """
+    Spread array-like `value` with one entry per True row of `mask` over all rows, so that it can be
+    passed to `Series.mask`. Scalars, Series (aligned on the index) and arrays with one entry per row
+    are returned as they are.
+    """
+    if not pd.api.types.is_list_like(value) or isinstance(value, (pd.Series, pd.DataFrame)):
+        return value
+
+    values = value if isinstance(value, (np.ndarray, pd.Index, pd.api.extensions.ExtensionArray)) else np.asarray(value)
+    matched = int(mask.sum())
+    if len(values) == len(mask):
+        return values
+    if len(values) != matched:
+        raise ValueError(
+            f"`{name}` has {len(values)} entries, but the condition selects {matched} of {len(mask)} rows. "
+            "Array-like values need one entry per selected row or one entry per row."
+        )
+    if matched == 0:
+        return np.full(len(mask), np.nan)
+    # Every row takes the entry of the last selected row up to it; only the selected rows are used
+    return values.take(np.maximum(np.cumsum(mask) - 1, 0))
+
 
 #Pandas accessors:
 with warnings.catch_warnings():
@@ -171,8 +282,86 @@ with warnings.catch_warnings():
     class Pd_Pychemist:
         def __init__(self, pandas_obj):
             self._obj = pandas_obj
+
+        @property
+        def _panel(self):
+            return get_declared_panel(self._obj)
+
+        @_panel.setter
+        def _panel(self, panel):
+            set_declared_panel(self._obj, panel)
+
+        def set_panel(self, identifier, time):
+            """
+            Declare the panel structure of the DataFrame, so that it is computed only once.
+
+            The identifier codes, the sort permutation and the group boundaries are cached on the
+            DataFrame and reused by `lag`, `lead` and `shift`, which can then be called without the
+            `identifier` and `time` arguments. The cache is validated against the key columns on every
+            use and rebuilt when they have changed. DataFrames returned by `lag`, `lead` and `shift`
+            inherit the panel when their rows are unchanged.
+
+            Parameters:
+            -----------
+            identifier : str
+                The unit or company identifier column name in the DataFrame.
+
+            time : str
+                The time period identifier column name in the DataFrame.
+
+            Returns:
+            --------
+            pd.DataFrame
+                Returns the DataFrame itself, to allow chaining.
+            """
+
+            for var in [identifier, time]:
+                if var not in self._obj:
+                    raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
+
+            self._panel = (identifier, time, PanelIndex(self._obj[identifier], self._obj[time]))
+            return self._obj
+
+        def _panel_index(self, df, identifier, time):
+            """
+            Return the identifier and time column names and the PanelIndex of `df`, reusing the
+            declared panel when it still matches the key columns.
+            """
+            if self._panel is not None:
+                declared_identifier, declared_time, panel = self._panel
+                identifier = declared_identifier if identifier is None else identifier
+                time = declared_time if time is None else time
+                if (identifier, time) == (declared_identifier, declared_time):
+                    if panel.matches(df[identifier], df[time]):
+                        return identifier, time, panel
+                    panel = PanelIndex(df[identifier], df[time])
+                    self._panel = (identifier, time, panel)
+                    return identifier, time, panel
+
+            if identifier is None or time is None:
+                raise TypeError("You need to enter the identifier and time columns, or declare them first with `set_panel`.")
+            return identifier, time, PanelIndex(df[identifier], df[time])
         
-        def mutate(self, query_str, column, value, other=None):
+        def lazy(self):
+            """
+            Start a lazy chain of operations, which only runs when `collect()` is called.
+
+            The chain has the `mutate`, `case_when`, `lag`, `lead`, `shift` and `select` methods of this
+            accessor (without `inplace`). On `collect()`, shifts on the same panel are computed in one
+            pass, only the columns that are needed are copied, and all mutations are applied to a single
+            copy of the frame. Call `explain()` to see the plan. A panel declared with `set_panel` is used
+            for the shifts without identifier and time.
+
+            Returns:
+            --------
+            LazyFrame
+                An empty chain on this DataFrame.
+            """
+
+            return LazyFrame(self._obj, self._panel)
+
+        @instrumented("chem.mutate")
+        def mutate(self, query_str, column, value, other=None, *, inplace=False):
             """
             Conditionally update values in a DataFrame column based on a query string.
 
@@ -183,55 +372,282 @@ with warnings.catch_warnings():
             query_str : str
                 A pandas query string defining the condition for rows to update.
             value : scalar or array-like
-                The new value(s) to assign to rows where the condition is True.
+                The new value(s) to assign to rows where the condition is True. Array-like values need
+                one entry per matching row or one entry per row (Series are aligned on the index). A value
+                of another type than `column` upcasts the column (e.g. to object) instead of raising.
             other : scalar or array-like, optional
-                The new value(s) to assign to rows where the condition is False.
+                The new value(s) to assign to rows where the condition is False, with one entry per
+                non-matching row or one entry per row if array-like.
+            inplace : bool, default False
+                If True, modify the DataFrame in place and return None.
+                If False, return a modified copy of the DataFrame. Under pandas Copy-on-Write, the copy
+                only allocates memory for `column`; the other columns are shared with the original.
 
             Returns:
             --------
-            pd.DataFrame
-                Returns the modified copy.
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
             """
 
-            df = self._obj.copy()
-            
-            match_idx = df.query(query_str).index
-            non_match_idx = df.index.difference(match_idx)
+            return mutate(self._obj, query_str, column, value, other, inplace=inplace)
 
-            df.loc[match_idx, column] = value
-            if other is not None:
-                df.loc[non_match_idx, column] = other
+        @instrumented("chem.case_when")
+        def case_when(self, column, caselist, default=None, *, inplace=False):
+            """
+            Set a DataFrame column from a list of conditions, in one pass.
 
-            return df
-            
+            The conditions are checked in order and every row gets the value of the first condition it
+            meets, like a SQL `CASE WHEN` statement. This replaces a chain of `mutate` calls.
 
-        def lag(self, variables, identifier, time, shift=1, *, replace=False):
+            Parameters:
+            -----------
+            column : str
+                The name of the column to update or create.
+            caselist : list of tuple
+                A list of (query_str, value) pairs. `query_str` is a pandas query string defining the condition,
+                `value` the scalar or array-like value(s) to assign to the rows where it is True. Array-like
+                values need one entry per matching row or one entry per row (Series are aligned on the index).
+                A value of another type than `column` upcasts the column (e.g. to object) instead of raising.
+            default : scalar or array-like, optional
+                The value(s) to assign to rows that meet none of the conditions, with one entry per such row or
+                one entry per row if array-like. If None, these rows keep their current values (or get missing
+                values if `column` is created).
+            inplace : bool, default False
+                If True, modify the DataFrame in place and return None.
+                If False, return a modified copy of the DataFrame.
+
+            Returns:
+            --------
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
             """
-            Create lagged versions of one or more variables.
+
+            return case_when(self._obj, column, caselist, default, inplace=inplace)
+
+        def _grouped(self, operation, variables, by, suffix, replace, inplace, compute):
+            """
+            Validate the arguments of `winsorize` and `standardize`, factorize the groups once and write
+            the columns computed by `compute(df, variables, codes, ngroups)` back in one block.
+            """
+            if isinstance(variables, str):
+                variables = [variables]
+            if isinstance(by, str):
+                by = [by]
+            if not isinstance(variables, list) or not (by is None or isinstance(by, list)):
+                raise TypeError("The variables and groups need to be a single column name or a list of column names.")
+            if suffix is not None and not isinstance(suffix, str):
+                raise TypeError("The suffix needs to be a string.")
+            if not isinstance(replace, bool):
+                raise TypeError("The 'replace' argument must be a boolean (True or False).")
+            if not isinstance(inplace, bool):
+                raise TypeError(f"'inplace' must be a bool, got {type(inplace).__name__}")
+
+            df = self._obj
+            for var in variables + (by or []):
+                if var not in df:
+                    raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
+            for var in variables:
+                if not pd.api.types.is_numeric_dtype(df[var]) or pd.api.types.is_bool_dtype(df[var]):
+                    raise TypeError(f"The variable `{var}` needs to be numeric.")
+
+            conflict_columns = []
+            if suffix is not None:
+                with phase("conflict check"):
+                    conflict_columns = [var + suffix for var in variables if var + suffix in df.columns]
+                if conflict_columns and not replace:
+                    raise ValueError(f"The following {operation} columns already exist: {', '.join(conflict_columns)}")
+
+            with phase("index"):
+                codes, ngroups = group_codes(df, by)
+            with phase(operation):
+                columns = compute(df, variables, codes, ngroups)
+            if suffix is not None:
+                columns = {var + suffix: values for var, values in columns.items()}
+
+            if inplace:
+                with phase("assign"):
+                    df[list(columns)] = pd.DataFrame(columns, index=df.index)
+                return None
+
+            with phase("copy"):
+                result = safe_copy(df)
+            with phase("assign"):
+                result[list(columns)] = pd.DataFrame(columns, index=df.index)
+            if self._panel is not None:
+                result.chem._panel = self._panel
+            return result
+
+        @instrumented("chem.winsorize")
+        def winsorize(self, variables, by=None, limits=(0.01, 0.99), *, suffix=None, sketch_size=None, seed=None,
+                      replace=False, inplace=False):
+            """
+            Clip one or more variables to their quantiles within every group (e.g. every year).
+
+            The group keys are factorized once, the quantiles of all variables are found in one batched
+            sort, and the clipped columns are written back in one block, instead of one
+            `groupby().transform("quantile")` per variable and per bound.
 
             Parameters:
             -----------
-            identifier : str
-                The unit or company identifier column name in the DataFrame.
+            variables : str or list of str
+                The numeric column(s) to winsorize.
 
-            time : str
-                The time period identifier column name in the DataFrame.
+            by : str or list of str, optional
+                The column(s) that define the groups, e.g. "year" or ["industry", "year"]. Defaults to
+                None (the quantiles of the whole column). Rows with a missing group keep their values.
 
-            variables : list of str
-                A list of column names for which lagged or lead variables will be created.
+            limits : tuple, default=(0.01, 0.99)
+                The lower and upper quantile, between 0 and 1. Use None for a side that isn't clipped.
+                The quantiles are interpolated linearly, as in `Series.quantile`.
 
-            shift : int, default=1
-                The number of time periods to shift. A positive integer creates lagged variables, while a negative 
-                integer creates lead variables.
+            suffix : str, optional
+                If given, store the results in new columns `<variable><suffix>` (e.g. "_w") instead of
+                overwriting the variables.
+
+            sketch_size : int, optional
+                Approximate the quantiles of groups with more rows than this from a uniform random sample
+                of about `sketch_size` of their rows, which is much cheaper to sort for very large groups.
+                Defaults to None (exact quantiles).
+
+            seed : int, optional
+                The seed of the random sample used with `sketch_size`.
 
             replace : bool, optional, default=False
-                Whether to replace existing lagged columns if they already exist.
+                Whether to replace existing columns `<variable><suffix>`.
+                If False, a ValueError will be raised when a conflict is found.
+
+            inplace : bool, default False
+                If True, write the results into the DataFrame in place and return None.
+                If False, return a modified copy. The index and row order are kept in both cases.
+
+            Returns:
+            --------
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
+            """
+
+            if not isinstance(limits, (tuple, list)) or len(limits) != 2:
+                raise TypeError("The limits need to be a (lower, upper) pair of quantiles.")
+            for q in limits:
+                if q is not None and not (isinstance(q, (int, float)) and 0 <= q <= 1):
+                    raise ValueError("The limits need to be quantiles between 0 and 1, or None.")
+            if None not in limits and limits[0] > limits[1]:
+                raise ValueError("The lower limit cannot be above the upper limit.")
+            if sketch_size is not None and (not isinstance(sketch_size, int) or sketch_size < 1):
+                raise ValueError("sketch_size needs to be a positive integer.")
+
+            def compute(df, variables, codes, ngroups):
+                return winsorize_columns(df, variables, codes, ngroups, tuple(limits), sketch_size, seed)
+
+            return self._grouped("winsorize", variables, by, suffix, replace, inplace, compute)
+
+        @instrumented("chem.standardize")
+        def standardize(self, variables, by=None, *, ddof=1, suffix=None, replace=False, inplace=False):
+            """
+            Convert one or more variables to z-scores within every group (e.g. every year).
+
+            The group keys are factorized once, and the means and standard deviations of all variables
+            are computed together on the group-sorted values; the z-scores are written back in one block.
+
+            Parameters:
+            -----------
+            variables : str or list of str
+                The numeric column(s) to standardize.
+
+            by : str or list of str, optional
+                The column(s) that define the groups, e.g. "year" or ["industry", "year"]. Defaults to
+                None (the mean and standard deviation of the whole column). Rows with a missing group get
+                missing values.
+
+            ddof : int, default=1
+                The delta degrees of freedom of the standard deviation, as in `Series.std`.
+
+            suffix : str, optional
+                If given, store the results in new columns `<variable><suffix>` (e.g. "_z") instead of
+                overwriting the variables.
+
+            replace : bool, optional, default=False
+                Whether to replace existing columns `<variable><suffix>`.
                 If False, a ValueError will be raised when a conflict is found.
 
+            inplace : bool, default False
+                If True, write the results into the DataFrame in place and return None.
+                If False, return a modified copy. The index and row order are kept in both cases.
+
+            Returns:
+            --------
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
+            """
+
+            if not isinstance(ddof, int) or isinstance(ddof, bool) or ddof < 0:
+                raise ValueError("ddof needs to be a non-negative integer.")
+
+            def compute(df, variables, codes, ngroups):
+                return standardize_columns(df, variables, codes, ngroups, ddof)
+
+            return self._grouped("standardize", variables, by, suffix, replace, inplace, compute)
+
+        @instrumented("chem.split_pipe")
+        def split_pipe(self, column, output="list", *, sep="|"):
+            """
+            Split a column of delimited lists such as "1|2|3" in one vectorized pass.
+
+            Empty elements are dropped, and the elements become integers if every element in the
+            column is an integer, as `convert_pipe_list` does per cell.
+
+            Parameters:
+            -----------
+            column : str
+                The column with the delimited strings.
+            output : str, default="list"
+                - "list": replace the column by a column of Arrow lists.
+                - "explode": a long DataFrame with one row per element, repeating the other columns and
+                  the index of its row (like `DataFrame.explode`). Rows without elements are left out.
+                - "indicators": replace the column by sparse boolean columns `<column>_<element>`, one
+                  per distinct element, added at the end (like `pandas.get_dummies`).
+            sep : str, default="|"
+                The delimiter.
+
             Returns:
             --------
             pd.DataFrame
-                Returns the modified copy.
+                A modified copy of the DataFrame.
+            """
+
+            df = self._obj
+            if column not in df:
+                raise KeyError(f"The variable `{column}` does not exist in the DataFrame.")
+            if output not in SPLIT_OUTPUTS:
+                raise ValueError(f"Unknown output '{output}'; choose from {', '.join(SPLIT_OUTPUTS)}.")
+
+            if output == "list":
+                with phase("copy"):
+                    result = safe_copy(df)
+                result[column] = split_pipe(df[column], "list", sep=sep)
+                return result
+
+            if output == "indicators":
+                indicators = split_pipe(df[column], "indicators", sep=sep, prefix=column)
+                with phase("conflict check"):
+                    conflict_columns = [col for col in indicators.columns if col in df.columns and col != column]
+                if conflict_columns:
+                    raise ValueError(f"The following indicator columns already exist: {', '.join(conflict_columns)}")
+                with phase("assign"):
+                    return concat_columns([df.drop(columns=column), indicators])
+
+            with phase("split"):
+                _, tokens, rows = _split_tokens(df[column], sep)
+            with phase("copy"):
+                result = df.take(rows)
+            with phase("assign"):
+                result[column] = tokens.to_pandas().array
+            return result
+
+        def _shift(self, variables, identifier, time, shifts, replace, inplace, n_jobs=None):
+            """
+            Create shifted versions of one or more variables for one or more horizons in a single pass.
+            Positive shifts create lagged variables, negative shifts create lead variables.
             """
 
             #Convert single variable (string) to a list
@@ -243,106 +659,311 @@ with warnings.catch_warnings():
             
             if not isinstance(replace,bool):
                 raise TypeError("The 'replace' argument must be a boolean (True or False).")
-            
-            df = self._obj.copy() #Prevent the original dataframe from getting modified (shouldn't happen, but as a precaution)
 
-            if not isinstance(shift, int):
-                raise TypeError("Shift value needs to be a positive integer")
-            if shift <= 0:
-                raise ValueError("Shift value needs to be a positive integer.")
-            
+            if not isinstance(inplace, bool):
+                raise TypeError(f"'inplace' must be a bool, got {type(inplace).__name__}")
+
+            df = self._obj #Not modified unless inplace=True: the result is built by shift_frame, which only copies what it needs
+
             for var in variables:
                 if var not in df:
                     raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
-            
-            df_lag = df[[time] + [identifier] + variables].copy()
-            df_lag[time] = df_lag[time] + shift
 
             # Handle suffixes for columns:
-            suffix = f'_lag{shift}' if shift > 1 else '_lag'
+            suffixes = [_shift_suffix(shift) for shift in shifts]
 
-            # Identify the new columns that will be created (for the conflict check)
-            new_columns = [var + suffix for var in variables]
+            with phase("conflict check"):
+                # Identify the new columns that will be created (for the conflict check)
+                new_columns = [var + suffix for suffix in suffixes for var in variables]
 
-            # Check if any of the new columns already exist in the dataframe
-            conflict_columns = [col for col in new_columns if col in df.columns]
+                # Check if any of the new columns already exist in the dataframe
+                conflict_columns = [col for col in new_columns if col in df.columns]
             
             if conflict_columns:
                 if replace==False:
                     raise ValueError(f"The following lag/lead columns already exist: {', '.join(conflict_columns)}")
-                else:
-                    df=df.drop(columns=conflict_columns)
+                elif not inplace:
+                    with phase("copy"):
+                        df=df.drop(columns=conflict_columns)
             
-            # Perform the merge if no conflicts
-            return pd.merge(df, df_lag, how="left", left_on=[identifier, time], right_on=[identifier, time], suffixes=['', suffix])
+            # Look up the shifted values positionally for all horizons at once
+            with phase("index"):
+                identifier, time, panel = self._panel_index(df, identifier, time)
+
+            if inplace:
+                # Append-only: only the new columns are allocated
+                with phase("shift"):
+                    rows, takers = shift_indexer(panel, shifts, n_jobs)
+                    if rows is not None:
+                        raise ValueError("The lag/lead variables cannot be added in place, because duplicate (identifier, time) pairs would repeat rows.")
+                    shifted = shift_columns(df, variables, takers, suffixes)
+                with phase("assign"):
+                    for col in conflict_columns:
+                        del df[col]
+                    for col, values in shifted.items():
+                        df[col] = values
+                return None
+
+            result = shift_frame(df, variables, panel, shifts, suffixes, n_jobs)
+
+            # Same rows in the same order: the result shares the panel index
+            if self._panel is not None and len(result) == len(df):
+                result.chem._panel = self._panel
+            return result
+
+        @instrumented("chem.lag")
+        def lag(self, variables, identifier=None, time=None, shift=1, *, replace=False, inplace=False, n_jobs=None):
+            """
+            Create lagged versions of one or more variables.
+
+            Parameters:
+            -----------
+            identifier : str, optional
+                The unit or company identifier column name in the DataFrame. Defaults to the panel
+                declared with `set_panel`.
+
+            time : str, optional
+                The time period identifier column name in the DataFrame. Defaults to the panel
+                declared with `set_panel`.
+
+            variables : list of str
+                A list of column names for which lagged variables will be created.
+
+            shift : int or list of int, default=1
+                The number of time periods to shift, as a positive integer. A list of positive
+                integers creates lagged variables for every horizon in a single pass
+                (e.g. `[1, 2, 3]` creates `_lag`, `_lag2` and `_lag3`).
+
+            replace : bool, optional, default=False
+                Whether to replace existing lagged columns if they already exist.
+                If False, a ValueError will be raised when a conflict is found.
+
+            inplace : bool, default False
+                If True, append the new columns to the DataFrame in place (keeping its index) and return None.
+                If False, return a modified copy with a fresh index. Under pandas Copy-on-Write, the copy
+                shares the existing columns with the original and only allocates the new ones.
+
+            n_jobs : int, optional
+                The number of worker processes, or -1 for one per CPU. The panel is partitioned by
+                identifier and the result is identical to the serial one. Starting the workers takes
+                time, so this only pays off for large panels. Defaults to None (no workers).
+
+            Returns:
+            --------
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
+            """
+
+            shifts = _shift_list(shift)
+            for value in shifts:
+                if value <= 0:
+                    raise ValueError("Shift value needs to be a positive integer.")
+
+            return self._shift(variables, identifier, time, shifts, replace, inplace, n_jobs)
         
-        def lead(self, variables, identifier, time, shift=1, *, replace=False):
+        @instrumented("chem.lead")
+        def lead(self, variables, identifier=None, time=None, shift=1, *, replace=False, inplace=False, n_jobs=None):
             """
             Create lead versions of one or more variables.
 
             Parameters:
             -----------
-            identifier : str
-                The unit or company identifier column name in the DataFrame.
+            identifier : str, optional
+                The unit or company identifier column name in the DataFrame. Defaults to the panel
+                declared with `set_panel`.
 
-            time : str
-                The time period identifier column name in the DataFrame.
+            time : str, optional
+                The time period identifier column name in the DataFrame. Defaults to the panel
+                declared with `set_panel`.
 
             variables : list of str
-                A list of column names for which lagged or lead variables will be created.
+                A list of column names for which lead variables will be created.
 
-            shift : int, default=1
-                The number of time periods to shift. A positive integer creates lagged variables, while a negative 
-                integer creates lead variables.
+            shift : int or list of int, default=1
+                The number of time periods to shift, as a positive integer. A list of positive
+                integers creates lead variables for every horizon in a single pass
+                (e.g. `[1, 2]` creates `_lead` and `_lead2`).
 
             replace : bool, optional, default=False
                 Whether to replace existing lead columns if they already exist.
                 If False, a ValueError will be raised when a conflict is found.
 
+            inplace : bool, default False
+                If True, append the new columns to the DataFrame in place (keeping its index) and return None.
+                If False, return a modified copy with a fresh index. Under pandas Copy-on-Write, the copy
+                shares the existing columns with the original and only allocates the new ones.
+
+            n_jobs : int, optional
+                The number of worker processes, or -1 for one per CPU. The panel is partitioned by
+                identifier and the result is identical to the serial one. Starting the workers takes
+                time, so this only pays off for large panels. Defaults to None (no workers).
+
             Returns:
             --------
-            pd.DataFrame
-                Returns the modified copy.
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
             """
 
-            #Convert single variable (string) to a list
-            if isinstance(variables,str):
-                variables=[variables]
+            shifts = _shift_list(shift)
+            for value in shifts:
+                if value <= 0:
+                    raise ValueError("Shift value needs to be a positive integer.")
 
-            if not isinstance(variables,list):
-                raise TypeError("You need to enter a single variable or a list of variables for which lagged variables need to be computed.")
-            
-            if not isinstance(replace,bool):
+            return self._shift(variables, identifier, time, [-value for value in shifts], replace, inplace, n_jobs) #Minus shift to generate lead variables
+
+        @instrumented("chem.shift")
+        def shift(self, variables, identifier=None, time=None, shift=1, *, replace=False, inplace=False, n_jobs=None):
+            """
+            Create lagged and/or lead versions of one or more variables in a single pass.
+
+            Parameters:
+            -----------
+            identifier : str, optional
+                The unit or company identifier column name in the DataFrame. Defaults to the panel
+                declared with `set_panel`.
+
+            time : str, optional
+                The time period identifier column name in the DataFrame. Defaults to the panel
+                declared with `set_panel`.
+
+            variables : list of str
+                A list of column names for which lagged or lead variables will be created.
+
+            shift : int or list of int, default=1
+                The number of time periods to shift. Positive integers create lagged variables, while negative
+                integers create lead variables (e.g. `[1, 2, -1]` creates `_lag`, `_lag2` and `_lead`).
+
+            replace : bool, optional, default=False
+                Whether to replace existing lag/lead columns if they already exist.
+                If False, a ValueError will be raised when a conflict is found.
+
+            inplace : bool, default False
+                If True, append the new columns to the DataFrame in place (keeping its index) and return None.
+                If False, return a modified copy with a fresh index. Under pandas Copy-on-Write, the copy
+                shares the existing columns with the original and only allocates the new ones.
+
+            n_jobs : int, optional
+                The number of worker processes, or -1 for one per CPU. The panel is partitioned by
+                identifier and the result is identical to the serial one. Starting the workers takes
+                time, so this only pays off for large panels. Defaults to None (no workers).
+
+            Returns:
+            --------
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
+            """
+
+            shifts = _shift_list(shift)
+            for value in shifts:
+                if value == 0:
+                    raise ValueError("Shift value cannot be equal to 0, as it would not change the data.")
+
+            return self._shift(variables, identifier, time, shifts, replace, inplace, n_jobs)
+
+        @instrumented("chem.rolling")
+        def rolling(self, variables, identifier=None, time=None, *, window, stats="mean", min_periods=None,
+                    replace=False, inplace=False, n_jobs=None):
+            """
+            Compute trailing-window statistics of one or more variables within every unit.
+
+            The window of a row covers the `window` periods up to and including its own: the rows of the
+            same unit with a time in `(time - window, time]`. Windows are measured in time, not in rows, so
+            a missing year leaves a hole in the window instead of pulling in an older year, just like
+            `lag` returns a missing value across a gap.
+
+            Parameters:
+            -----------
+            variables : str or list of str
+                The numeric column(s) to summarize.
+
+            identifier : str, optional
+                The unit or company identifier column name in the DataFrame. Defaults to the panel
+                declared with `set_panel`.
+
+            time : str, optional
+                The time period column name in the DataFrame, with integer periods (e.g. years).
+                Defaults to the panel declared with `set_panel`.
+
+            window : int
+                The number of periods in the window, including the current one.
+
+            stats : str or list of str, default="mean"
+                The statistics to compute: "count", "sum", "mean", "var" and/or "std" (the last two
+                with ddof=1). Every statistic creates a column `<variable>_<stat><window>`, e.g. `roa_std5`.
+
+            min_periods : int, optional
+                The minimum number of non-missing values in a window; windows with fewer values get a
+                missing value. Defaults to `window`, so any gap or missing value within the window gives
+                a missing value.
+
+            replace : bool, optional, default=False
+                Whether to replace existing columns with the same names.
+                If False, a ValueError will be raised when a conflict is found.
+
+            inplace : bool, default False
+                If True, add the new columns to the DataFrame in place and return None.
+                If False, return a modified copy. The index and row order are kept in both cases.
+
+            n_jobs : int, optional
+                The number of worker processes, or -1 for one per CPU. The panel is partitioned by
+                identifier and the result is identical to the serial one. Starting the workers takes
+                time, so this only pays off for large panels. Defaults to None (no workers).
+
+            Returns:
+            --------
+            pd.DataFrame or None
+                Returns the modified copy if `inplace=False`, otherwise returns None.
+            """
+
+            if isinstance(variables, str):
+                variables = [variables]
+            if isinstance(stats, str):
+                stats = [stats]
+            if not isinstance(variables, list) or not isinstance(stats, list):
+                raise TypeError("The variables and stats need to be a single name or a list of names.")
+            for stat in stats:
+                if stat not in ROLLING_STATS:
+                    raise ValueError(f"Unknown statistic '{stat}'; choose from {', '.join(ROLLING_STATS)}.")
+            if not isinstance(window, int) or isinstance(window, bool) or window < 1:
+                raise ValueError("The window needs to be a positive integer.")
+            min_periods = window if min_periods is None else min_periods
+            if not isinstance(min_periods, int) or not 0 <= min_periods <= window:
+                raise ValueError("min_periods needs to be an integer between 0 and the window.")
+            if not isinstance(replace, bool):
                 raise TypeError("The 'replace' argument must be a boolean (True or False).")
-            
-            df = self._obj.copy() #Prevent the original dataframe from getting modified (shouldn't happen, but as a precaution)
+            if not isinstance(inplace, bool):
+                raise TypeError(f"'inplace' must be a bool, got {type(inplace).__name__}")
 
-            if not isinstance(shift, int):
-                raise TypeError("Shift value needs to be a positive integer")
-            if shift <= 0:
-                raise ValueError("Shift value needs to be a positive integer.")
-            
+            df = self._obj
             for var in variables:
                 if var not in df:
                     raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
-            
-            df_lag = df[[time] + [identifier] + variables].copy()
-            df_lag[time] = df_lag[time] - shift #Minus shift to generate lead variables
-
-            # Handle suffixes for columns:
-            suffix = f'_lead{shift}' if shift > 1 else '_lead'
-            
-            # Identify the new columns that will be created (for the conflict check)
-            new_columns = [var + suffix for var in variables]
-
-            # Check if any of the new columns already exist in the dataframe
-            conflict_columns = [col for col in new_columns if col in df.columns]
-            
-            if conflict_columns:
-                if replace==False:
-                    raise ValueError(f"The following lag/lead columns already exist: {', '.join(conflict_columns)}")
-                else:
-                    df=df.drop(columns=conflict_columns)
-            
-            # Perform the merge if no conflicts
-            return pd.merge(df, df_lag, how="left", left_on=[identifier, time], right_on=[identifier, time], suffixes=['', suffix])
\ No newline at end of file
+                if not pd.api.types.is_numeric_dtype(df[var]) or pd.api.types.is_bool_dtype(df[var]):
+                    raise TypeError(f"The variable `{var}` needs to be numeric.")
+
+            with phase("conflict check"):
+                new_columns = [f"{var}_{stat}{window}" for var in variables for stat in stats]
+                conflict_columns = [col for col in new_columns if col in df.columns]
+            if conflict_columns and not replace:
+                raise ValueError(f"The following rolling columns already exist: {', '.join(conflict_columns)}")
+
+            with phase("index"):
+                identifier, time, panel = self._panel_index(df, identifier, time)
+            with phase("rolling"):
+                columns = rolling_columns_parallel(df, variables, panel, window, stats, min_periods, n_jobs)
+
+            if inplace:
+                with phase("assign"):
+                    for col in conflict_columns:
+                        del df[col]
+                    for col, values in columns.items():
+                        df[col] = values
+                return None
+
+            with phase("copy"):
+                base = df.drop(columns=conflict_columns) if conflict_columns else safe_copy(df)
+            with phase("assign"):
+                result = concat_columns([base, pd.DataFrame(columns, index=df.index)])
+            if self._panel is not None:
+                result.chem._panel = self._panel
+            return result
@@ -0,0 +1,26 @@
+import pandas as pd
+
+
+def copy_on_write():
+    """True if pandas Copy-on-Write is active, i.e. a reference to a column never sees later writes."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.options.mode.copy_on_write is True
+
+
+def safe_copy(dataframe):
+    """
+    Return a copy of `dataframe` that can be modified without affecting the original.
+
+    Under Copy-on-Write the copy is shallow, so unchanged columns share their memory with the
+    original and only the columns that are written to get copied. Without Copy-on-Write this is a
+    full (deep) copy.
+    """
+    return dataframe.copy(deep=not copy_on_write())
+
+
+def concat_columns(frames):
+    """Concatenate DataFrames with the same index side by side, without copying them again."""
+    if copy_on_write():
+        return pd.concat(frames, axis=1)
+    return pd.concat(frames, axis=1, copy=False)
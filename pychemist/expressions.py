@@ -0,0 +1,346 @@
+import ast
+import io
+import operator
+import re
+import threading
+import tokenize
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_BACKTICK = re.compile(r"`([^`]*)`")
+
+# The dtypes numexpr computes with exactly; it silently casts uint64 to int64 and float16 to float32
+_NUMEXPR_DTYPES = frozenset(np.dtype(name) for name in [
+    "bool", "int8", "int16", "int32", "int64", "uint8", "uint16", "uint32", "float32", "float64",
+])
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_COMPARE = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+_NUMEXPR_SYMBOLS = {
+    ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.Mod: "%", ast.Pow: "**",
+    ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">=",
+}
+
+
+class _Unsupported(Exception):
+    """The expression uses syntax that is left to `DataFrame.eval`."""
+
+
+def _parse(query_str):
+    """
+    Parse a pandas query string into a Python expression tree.
+
+    Backtick-quoted column names are replaced by placeholders, and `&` and `|` get the precedence
+    of `and` and `or`, as in the pandas parser.
+
+    Returns:
+    -------
+    tree : ast.Expression
+        The parsed expression.
+
+    names : dict
+        The identifiers used in the expression, mapped to the column names they refer to.
+    """
+    quoted = {}
+
+    def placeholder(match):
+        name = f"__pychemist_column_{len(quoted)}"
+        quoted[name] = match.group(1)
+        return name
+
+    source = _BACKTICK.sub(placeholder, query_str)
+    tokens = []
+    for token in tokenize.generate_tokens(io.StringIO(source).readline):
+        if token.type == tokenize.OP and token.string in ("&", "|"):
+            tokens.append((tokenize.NAME, "and" if token.string == "&" else "or"))
+        else:
+            tokens.append((token.type, token.string))
+    tree = ast.parse(tokenize.untokenize(tokens).strip(), mode="eval")
+
+    names = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names[node.id] = quoted.get(node.id, node.id)
+    return tree, names
+
+
+def _constant(node):
+    """The value of a (possibly negated) number, string or boolean literal."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float, str)):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _constant(node.operand)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return -value
+    raise _Unsupported
+
+
+def _compile_pandas(node, names):
+    """Compile an expression tree to a function of the DataFrame built on pandas Series operations."""
+    if isinstance(node, ast.Expression):
+        return _compile_pandas(node.body, names)
+
+    if isinstance(node, ast.Name):
+        column = names[node.id]
+        return lambda df: df[column]
+
+    if isinstance(node, ast.Constant):
+        value = _constant(node)
+        return lambda df: value
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_pandas(node.operand, names)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return lambda df: ~operand(df)
+        if isinstance(node.op, ast.USub):
+            return lambda df: -operand(df)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        raise _Unsupported
+
+    if isinstance(node, ast.BoolOp):
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        operands = [_compile_pandas(value, names) for value in node.values]
+
+        def boolop(df):
+            result = operands[0](df)
+            for operand in operands[1:]:
+                result = combine(result, operand(df))
+            return result
+        return boolop
+
+    if isinstance(node, ast.BinOp):
+        if type(node.op) not in _BINARY:
+            raise _Unsupported
+        func = _BINARY[type(node.op)]
+        left, right = _compile_pandas(node.left, names), _compile_pandas(node.right, names)
+        return lambda df: func(left(df), right(df))
+
+    if isinstance(node, ast.Compare):
+        # Chained comparisons (a < b < c) are combined with &
+        comparisons = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            comparisons.append(_compile_comparison(op, left, right, names))
+            left = right
+
+        def compare(df):
+            result = comparisons[0](df)
+            for comparison in comparisons[1:]:
+                result = result & comparison(df)
+            return result
+        return compare
+
+    raise _Unsupported
+
+
+def _compile_comparison(op, left, right, names):
+    # `x == [..]`, `x in [..]` and their negations are membership tests, as in pandas
+    if isinstance(right, (ast.List, ast.Tuple)) and isinstance(op, (ast.Eq, ast.NotEq, ast.In, ast.NotIn)):
+        values = [_constant(element) for element in right.elts]
+        if not isinstance(left, ast.Name):
+            raise _Unsupported
+        column = names[left.id]
+        if isinstance(op, (ast.Eq, ast.In)):
+            return lambda df: df[column].isin(values)
+        return lambda df: ~df[column].isin(values)
+
+    if type(op) not in _COMPARE:
+        raise _Unsupported
+    func = _COMPARE[type(op)]
+    left, right = _compile_pandas(left, names), _compile_pandas(right, names)
+    return lambda df: func(left(df), right(df))
+
+
+def _numexpr_source(node, names, arguments):
+    """Translate an expression tree to numexpr syntax, naming the columns `_0`, `_1`, ..."""
+    if isinstance(node, ast.Expression):
+        return _numexpr_source(node.body, names, arguments)
+
+    if isinstance(node, ast.Name):
+        column = names[node.id]
+        if column not in arguments:
+            arguments[column] = f"_{len(arguments)}"
+        return arguments[column]
+
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, (bool, int, float)):
+            return repr(node.value)
+        raise _Unsupported
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _numexpr_source(node.operand, names, arguments)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return f"(~{operand})"
+        if isinstance(node.op, ast.USub):
+            return f"(-{operand})"
+        if isinstance(node.op, ast.UAdd):
+            return operand
+        raise _Unsupported
+
+    if isinstance(node, ast.BoolOp):
+        symbol = " & " if isinstance(node.op, ast.And) else " | "
+        return "(" + symbol.join(_numexpr_source(value, names, arguments) for value in node.values) + ")"
+
+    if isinstance(node, ast.BinOp):
+        if type(node.op) not in _NUMEXPR_SYMBOLS:
+            raise _Unsupported
+        left = _numexpr_source(node.left, names, arguments)
+        right = _numexpr_source(node.right, names, arguments)
+        return f"({left} {_NUMEXPR_SYMBOLS[type(node.op)]} {right})"
+
+    if isinstance(node, ast.Compare):
+        parts = []
+        left = _numexpr_source(node.left, names, arguments)
+        for op, comparator in zip(node.ops, node.comparators):
+            if type(op) not in _NUMEXPR_SYMBOLS:
+                raise _Unsupported
+            right = _numexpr_source(comparator, names, arguments)
+            parts.append(f"({left} {_NUMEXPR_SYMBOLS[type(op)]} {right})")
+            left = right
+        return parts[0] if len(parts) == 1 else "(" + " & ".join(parts) + ")"
+
+    raise _Unsupported
+
+
+def _compile(query_str, tree, names, dtypes):
+    """Compile a parsed expression for the given column dtypes; returns (kind, function of the DataFrame)."""
+    if tree is None or any(dtype is None for dtype in dtypes):
+        return "eval", lambda df: df.eval(query_str)
+
+    try:
+        import numexpr
+    except ImportError:
+        numexpr = None
+
+    if numexpr is not None and all(isinstance(dtype, np.dtype) and dtype in _NUMEXPR_DTYPES for dtype in dtypes):
+        try:
+            arguments = {}
+            source = _numexpr_source(tree, names, arguments)
+            # Validate (and let numexpr compile) the expression on empty columns of the right dtypes
+            by_column = dict(zip(names.values(), dtypes))
+            numexpr.evaluate(source, local_dict={name: np.empty(0, dtype=by_column[column])
+                                                 for column, name in arguments.items()})
+        except Exception:
+            pass
+        else:
+            def evaluate(df):
+                local_dict = {name: df[column].to_numpy() for column, name in arguments.items()}
+                return numexpr.evaluate(source, local_dict=local_dict)
+            return "numexpr", evaluate
+
+    try:
+        return "pandas", _compile_pandas(tree, names)
+    except _Unsupported:
+        return "eval", lambda df: df.eval(query_str)
+
+
+class ExpressionCache:
+    """
+    Bounded LRU cache of compiled `mutate` / `case_when` conditions.
+
+    A query string is parsed once and compiled once per combination of dtypes of the columns it
+    uses. Numeric conditions are compiled to a numexpr program when numexpr is installed, other
+    conditions to a chain of vectorized pandas operations. Syntax outside this subset (local `@`
+    variables, method calls, the index, ...) is left to `DataFrame.eval`, and the expression is
+    cached as such, so it is not parsed again either.
+
+    Parameters:
+    ----------
+    maxsize : int, default=256
+        The maximum number of compiled expressions to keep.
+    """
+
+    def __init__(self, maxsize=256):
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError("The cache size needs to be a non-negative integer.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._parsed = OrderedDict()
+        self._compiled = OrderedDict()
+        self._lock = threading.Lock()
+
+    def info(self):
+        """Return the hits, misses, maximum size and current size of the cache."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._compiled))
+
+    def clear(self):
+        """Empty the cache and reset the hit and miss counters."""
+        with self._lock:
+            self._parsed.clear()
+            self._compiled.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def kind(self, dataframe, query_str):
+        """Return how `query_str` is evaluated for `dataframe`: 'numexpr', 'pandas' or 'eval'."""
+        return self._lookup(dataframe, query_str)[0]
+
+    def evaluate(self, dataframe, query_str):
+        """Evaluate `query_str` on `dataframe`, compiling it only if it is not cached yet."""
+        return self._lookup(dataframe, query_str)[1](dataframe)
+
+    def _lookup(self, dataframe, query_str):
+        with self._lock:
+            parsed = self._parsed.get(query_str)
+            if parsed is not None:
+                self._parsed.move_to_end(query_str)
+        if parsed is None:
+            try:
+                parsed = _parse(query_str)
+            except (SyntaxError, tokenize.TokenError, ValueError):
+                parsed = (None, {})
+            self._store(self._parsed, query_str, parsed)
+
+        tree, names = parsed
+        dtypes = tuple(_column_dtype(dataframe, column) for column in names.values())
+        key = (query_str, dtypes)
+
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = _compile(query_str, tree, names, dtypes)
+        self._store(self._compiled, key, compiled)
+        return compiled
+
+    def _store(self, cache, key, value):
+        with self._lock:
+            cache[key] = value
+            while len(cache) > self.maxsize:
+                cache.popitem(last=False)
+
+
+def _column_dtype(dataframe, column):
+    """The dtype of a (unique) column, or None if the name doesn't refer to exactly one column."""
+    if column not in dataframe.columns or not dataframe.columns.is_unique:
+        return None
+    return dataframe[column].dtype
+
+
+expression_cache = ExpressionCache()
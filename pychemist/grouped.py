@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+
+
+def group_codes(dataframe, by):
+    """
+    Factorize the group keys once; returns (codes, ngroups).
+
+    `by` is a column name, a list of column names, or None for a single group. Rows with a missing
+    key get code -1, as they are left out by `DataFrame.groupby`.
+    """
+    n = len(dataframe)
+    if by is None:
+        return np.zeros(n, dtype=np.int64), int(n > 0)
+
+    codes = np.zeros(n, dtype=np.int64)
+    missing = np.zeros(n, dtype=bool)
+    for key in by:
+        key_codes, uniques = pd.factorize(dataframe[key])
+        missing |= key_codes < 0
+        # Renumber after every key, so that the combined codes stay small
+        codes, _ = pd.factorize(codes * len(uniques) + np.maximum(key_codes, 0))
+
+    result = np.full(n, -1, dtype=np.int64)
+    result[~missing], uniques = pd.factorize(codes[~missing])
+    return result, len(uniques)
+
+
+def _matrix(dataframe, variables):
+    """The values of `variables` as a float matrix of shape (variables, rows)."""
+    values = np.empty((len(variables), len(dataframe)))
+    for j, var in enumerate(variables):
+        values[j] = dataframe[var].to_numpy(dtype=float, na_value=np.nan)
+    return values
+
+
+def group_quantiles(values, codes, ngroups, quantiles):
+    """
+    Per-group quantiles of every row of `values`, with linear interpolation (as `Series.quantile`).
+
+    `values` has shape (variables, rows); rows with code -1 are left out. All variables are sorted
+    in two batched argsorts: by value, and then stably by group, so that the values of every group
+    end up together and sorted, with their missing values last. Only the order statistics around
+    the quantiles are then looked up.
+
+    Returns:
+    -------
+    list of numpy.ndarray
+        For every quantile, an array of shape (variables, ngroups); missing where a group has no values.
+    """
+    # Rows without a group go to an extra group at the end
+    bucket = np.where(codes < 0, ngroups, codes)
+    starts = np.concatenate([[0], np.cumsum(np.bincount(bucket, minlength=ngroups + 1))])[:ngroups]
+
+    # Ties don't matter in the sort by value. Small integer group codes are sorted with a radix sort,
+    # in linear time.
+    by_value = np.argsort(values, axis=1)
+    bucket = bucket.astype(np.uint8 if ngroups < 2 ** 8 else np.uint16 if ngroups < 2 ** 16 else np.int64)
+    by_group = np.argsort(bucket[by_value], axis=1, kind="stable")
+
+    counts = np.stack([np.bincount(bucket, weights=~np.isnan(row), minlength=ngroups + 1)[:ngroups] for row in values])
+    last = np.maximum(counts - 1, 0)
+    rows = np.arange(len(values))[:, None]
+
+    def order_statistic(rank):
+        # The value at `rank` within every group, for every variable
+        position = np.minimum(starts + rank, values.shape[1] - 1)
+        return values[rows, by_value[rows, by_group[rows, position]]]
+
+    results = []
+    for q in quantiles:
+        position = last * q
+        below = np.floor(position).astype(np.int64)
+        if values.shape[1]:
+            lower = order_statistic(below)
+            upper = order_statistic(np.minimum(below + 1, last.astype(np.int64)))
+            result = lower + (upper - lower) * (position - below)
+        else:
+            result = np.empty(counts.shape)
+        results.append(np.where(counts > 0, result, np.nan))
+    return results
+
+
+def winsorize_columns(dataframe, variables, codes, ngroups, limits, sketch_size=None, seed=None):
+    """
+    Clip every variable to its per-group quantiles `limits` (a (lower, upper) pair, either may be None).
+
+    With `sketch_size`, groups with more rows than that use the quantiles of a uniform random sample
+    of about `sketch_size` of their rows, which only has to be sorted instead of the whole group.
+
+    Returns:
+    -------
+    dict
+        The variables mapped to their clipped values. Rows with a missing group key keep their values.
+    """
+    values = _matrix(dataframe, variables)
+
+    sample, sample_codes = values, codes
+    if sketch_size is not None:
+        sizes = np.bincount(codes[codes >= 0], minlength=ngroups)
+        rate = np.append(np.minimum(1.0, sketch_size / np.maximum(sizes, 1)), 0.0)
+        keep = np.random.default_rng(seed).random(len(codes)) < rate[codes]
+        sample, sample_codes = values[:, keep], codes[keep]
+
+    bounds = iter(group_quantiles(sample, sample_codes, ngroups, [q for q in limits if q is not None]))
+    # Rows without a group get the bounds of the extra, unbounded group at the end
+    lower, upper = (np.append(next(bounds), np.full((len(variables), 1), np.nan), axis=1) if q is not None else None
+                    for q in limits)
+
+    # Comparisons with a missing value or bound are False, so both are left alone
+    new_columns = {}
+    for j, var in enumerate(variables):
+        column = values[j]
+        if lower is not None:
+            bound = lower[j][codes]
+            column = np.where(column < bound, bound, column)
+        if upper is not None:
+            bound = upper[j][codes]
+            column = np.where(column > bound, bound, column)
+        new_columns[var] = column
+    return new_columns
+
+
+def standardize_columns(dataframe, variables, codes, ngroups, ddof=1):
+    """
+    Subtract the per-group mean from every variable and divide by the per-group standard deviation.
+
+    The group sums are taken with `np.bincount` on the group codes, without sorting, and the
+    squared deviations from the group mean in a second pass (a two-pass variance, which stays
+    accurate for values with a large offset). Missing values are left out.
+
+    Returns:
+    -------
+    dict
+        The variables mapped to their z-scores. Rows with a missing group key, and groups with fewer
+        than `ddof + 1` values, get missing values.
+    """
+    # Rows without a group go to an extra group at the end, whose statistics are missing
+    bucket = np.where(codes < 0, ngroups, codes)
+
+    new_columns = {}
+    for var in variables:
+        values = dataframe[var].to_numpy(dtype=float, na_value=np.nan)
+        present = ~np.isnan(values)
+        counts = np.bincount(bucket, weights=present, minlength=ngroups + 1)
+        counts[ngroups] = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.bincount(bucket, weights=np.where(present, values, 0.0), minlength=ngroups + 1) / counts
+            deviations = values - mean[bucket]
+            squares = np.bincount(bucket, weights=np.where(present, deviations * deviations, 0.0), minlength=ngroups + 1)
+            std = np.sqrt(np.where(counts > ddof, squares / (counts - ddof), np.nan))
+            new_columns[var] = deviations / std[bucket]
+    return new_columns
@@ -0,0 +1,447 @@
+import copy
+import tokenize
+
+import pandas as pd
+
+from ._compat import safe_copy, concat_columns
+from .expressions import _parse
+from .panel import PanelIndex, shift_columns, _shift_suffix, _shift_list, set_declared_panel
+from .profiling import instrumented, phase
+
+
+class _Mutate:
+    """A recorded `mutate` or `case_when` of one column."""
+
+    def __init__(self, operation, column, caselist, default):
+        self.operation = operation
+        self.column = column
+        self.caselist = caselist
+        self.default = default
+        self.writes = {column}
+        # The columns the step reads, or None if they can't be determined (set when planning)
+        self.reads = None
+        # Array-like values are aligned on the index or on the row order, so the step can't be moved
+        values = [value for _, value in caselist] + [default]
+        self.pinned = any(value is not None and not pd.api.types.is_scalar(value) for value in values)
+
+    def planned(self, columns):
+        """A copy with the columns it reads, given the columns of the frame it runs on."""
+        step = copy.copy(self)
+        used = set()
+        for query_str, _ in self.caselist:
+            try:
+                _, names = _parse(query_str)
+            except (SyntaxError, tokenize.TokenError, ValueError):
+                return step
+            used.update(names.values())
+        # Names that aren't columns (local variables, the index) may change meaning when the step moves
+        if used <= set(columns):
+            step.reads = used | {self.column}
+        return step
+
+    def run(self, df):
+        from . import mutate, case_when
+
+        if self.operation == "mutate":
+            (query_str, value), = self.caselist
+            mutate(df, query_str, self.column, value, self.default, inplace=True)
+        else:
+            case_when(df, self.column, self.caselist, self.default, inplace=True)
+
+    def describe(self):
+        def show(value):
+            return repr(value) if pd.api.types.is_scalar(value) else f"<{type(value).__name__}>"
+
+        if self.operation == "mutate":
+            (query_str, value), = self.caselist
+            text = f"{self.column} = {show(value)} where {query_str!r}"
+            if self.default is not None:
+                text += f", else {show(self.default)}"
+        else:
+            cases = "; ".join(f"{query_str!r}: {show(value)}" for query_str, value in self.caselist)
+            text = f"{self.column} = [{cases}]"
+            if self.default is not None:
+                text += f", else {show(self.default)}"
+        return f"{self.operation:<10}{text}"
+
+
+class _Shift:
+    """A recorded `lag`, `lead` or `shift`."""
+
+    def __init__(self, operation, variables, identifier, time, shifts, replace):
+        self.operation = operation
+        self.variables = variables
+        self.identifier = identifier
+        self.time = time
+        self.shifts = shifts
+        self.suffixes = [_shift_suffix(shift) for shift in shifts]
+        self.replace = replace
+
+    @property
+    def new_columns(self):
+        return [var + suffix for suffix in self.suffixes for var in self.variables]
+
+    @property
+    def reads(self):
+        return set(self.variables) | {self.identifier, self.time}
+
+    @property
+    def writes(self):
+        return set(self.new_columns)
+
+    def resolved(self, declared):
+        """A copy with the identifier and time taken from the declared panel where they are missing."""
+        step = copy.copy(self)
+        if declared is not None:
+            step.identifier = declared[0] if step.identifier is None else step.identifier
+            step.time = declared[1] if step.time is None else step.time
+        if step.identifier is None or step.time is None:
+            raise TypeError("You need to enter the identifier and time columns, or declare them first with `set_panel`.")
+        return step
+
+    def describe(self):
+        return f"{self.operation}: {', '.join(self.new_columns) or '(no columns needed)'}"
+
+
+class _Select:
+    """A recorded `select`."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def describe(self):
+        return f"{'select':<10}{', '.join(map(str, self.columns))}"
+
+
+class _ShiftGroup:
+    """Shifts on the same panel, computed from a single panel index and a single row lookup."""
+
+    def __init__(self, step):
+        self.identifier = step.identifier
+        self.time = step.time
+        self.members = [step]
+
+    @property
+    def reads(self):
+        return set().union(*(member.reads for member in self.members))
+
+    @property
+    def writes(self):
+        return set().union(*(member.writes for member in self.members))
+
+    def accepts(self, step):
+        """Whether `step` can be computed in the same pass as the shifts in the group."""
+        return ((self.identifier, self.time) == (step.identifier, step.time)
+                and not self.writes & (step.reads | step.writes) and not self.reads & step.writes)
+
+    def describe(self):
+        lines = [f"{'shift':<10}on ({self.identifier}, {self.time})"
+                 + (f", {len(self.members)} steps fused" if len(self.members) > 1 else "")]
+        lines += [f"{'':<12}{member.describe()}" for member in self.members]
+        return "\n".join(lines)
+
+
+class LazyFrame:
+    """
+    A chain of `.chem` operations that is only executed when `collect` is called.
+
+    Create it with `df.chem.lazy()`, record operations with the same arguments as the `.chem`
+    accessor (`mutate`, `case_when`, `lag`, `lead`, `shift` and `select`), and call `collect` to get
+    the resulting DataFrame. Every method returns a new LazyFrame, so the chain can be branched.
+
+    Before executing, the chain is rewritten into a plan:
+
+    - Shifts on the same panel are computed together, from one panel index and one row lookup, as
+      long as the steps in between neither change their inputs nor use their outputs.
+    - Only the columns that the result or one of the steps needs are taken from the input frame,
+      and mutations of columns that are never used are skipped.
+    - The frame is copied once; all mutations are applied to that copy in place.
+
+    The result equals that of running the steps one by one. Use `explain` to see the plan.
+
+    Parameters:
+    ----------
+    dataframe : pandas.DataFrame
+        The input DataFrame. It is not modified.
+
+    panel : tuple, optional
+        The (identifier, time, PanelIndex) declared for the DataFrame with `set_panel`.
+
+    Examples:
+    --------
+    >>> plan = df.chem.lazy().mutate("assets <= 0", "roa", np.nan).lag(["assets", "roa"], "ticker", "year").lead("roa", "ticker", "year")
+    >>> print(plan.explain())
+    >>> result = plan.collect()
+    """
+
+    def __init__(self, dataframe, panel=None, steps=()):
+        self._obj = dataframe
+        self._panel = panel
+        self._steps = tuple(steps)
+
+    def __repr__(self):
+        return f"<LazyFrame: {len(self._obj)} rows, {len(self._steps)} steps>"
+
+    def _add(self, step):
+        return LazyFrame(self._obj, self._panel, self._steps + (step,))
+
+    def mutate(self, query_str, column, value, other=None):
+        """Record `df.chem.mutate(query_str, column, value, other)`; see `pychemist.mutate`."""
+        return self._add(_Mutate("mutate", column, [(query_str, value)], other))
+
+    def case_when(self, column, caselist, default=None):
+        """Record `df.chem.case_when(column, caselist, default)`; see `pychemist.case_when`."""
+        if not isinstance(caselist, list) or not all(isinstance(case, tuple) and len(case) == 2 for case in caselist):
+            raise TypeError("The 'caselist' argument must be a list of (query_str, value) tuples.")
+        return self._add(_Mutate("case_when", column, list(caselist), default))
+
+    def _shift(self, operation, variables, identifier, time, shifts, replace):
+        if isinstance(variables, str):
+            variables = [variables]
+        if not isinstance(variables, list):
+            raise TypeError("You need to enter a single variable or a list of variables for which lagged variables need to be computed.")
+        if not isinstance(replace, bool):
+            raise TypeError("The 'replace' argument must be a boolean (True or False).")
+        return self._add(_Shift(operation, list(variables), identifier, time, shifts, replace))
+
+    def lag(self, variables, identifier=None, time=None, shift=1, *, replace=False):
+        """Record `df.chem.lag(variables, identifier, time, shift, replace=replace)`."""
+        shifts = _shift_list(shift)
+        if any(value <= 0 for value in shifts):
+            raise ValueError("Shift value needs to be a positive integer.")
+        return self._shift("lag", variables, identifier, time, shifts, replace)
+
+    def lead(self, variables, identifier=None, time=None, shift=1, *, replace=False):
+        """Record `df.chem.lead(variables, identifier, time, shift, replace=replace)`."""
+        shifts = _shift_list(shift)
+        if any(value <= 0 for value in shifts):
+            raise ValueError("Shift value needs to be a positive integer.")
+        return self._shift("lead", variables, identifier, time, [-value for value in shifts], replace)
+
+    def shift(self, variables, identifier=None, time=None, shift=1, *, replace=False):
+        """Record `df.chem.shift(variables, identifier, time, shift, replace=replace)`."""
+        shifts = _shift_list(shift)
+        if 0 in shifts:
+            raise ValueError("Shift value cannot be equal to 0, as it would not change the data.")
+        return self._shift("shift", variables, identifier, time, shifts, replace)
+
+    def select(self, columns):
+        """Keep only `columns`, in this order. Columns that aren't selected are not copied at all."""
+        if isinstance(columns, str):
+            columns = [columns]
+        return self._add(_Select(list(columns)))
+
+    def _plan(self):
+        """
+        Validate the steps and rewrite them into a plan.
+
+        Returns:
+        -------
+        projection : list of str or None
+            The input columns to take, or None for all of them.
+
+        nodes : list
+            The steps to run, in order, with fused shifts as `_ShiftGroup`.
+
+        skipped : list
+            The mutations that were left out because their column isn't used.
+
+        columns : list of str
+            The columns of the result, in order.
+        """
+        # Run through the steps on the column names alone, raising the errors the steps would raise
+        columns = list(self._obj.columns)
+        planned = []
+        for step in self._steps:
+            if isinstance(step, _Select):
+                for var in step.columns:
+                    if var not in columns:
+                        raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
+                columns = list(step.columns)
+            elif isinstance(step, _Shift):
+                step = step.resolved(self._panel)
+                for var in step.variables + [step.identifier, step.time]:
+                    if var not in columns:
+                        raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
+                conflict_columns = [col for col in step.new_columns if col in columns]
+                if conflict_columns and not step.replace:
+                    raise ValueError(f"The following lag/lead columns already exist: {', '.join(conflict_columns)}")
+                columns = [col for col in columns if col not in conflict_columns] + step.new_columns
+            else:
+                step = step.planned(columns)
+                if step.column not in columns:
+                    columns = columns + [step.column]
+            planned.append(step)
+
+        # Move every shift forward to the last shift on the same panel, past the mutations in between
+        nodes = []
+        for step in planned:
+            group = _fusable(nodes, step) if isinstance(step, _Shift) else None
+            if group is not None:
+                group.members.append(step)
+            elif isinstance(step, _Shift):
+                nodes.append(_ShiftGroup(step))
+            else:
+                nodes.append(step)
+
+        # Walk back from the result to find the columns every step needs
+        needed, everything = set(columns), False
+        kept, skipped = [], []
+        for node in reversed(nodes):
+            if isinstance(node, _Select):
+                needed = set(node.columns)
+            elif isinstance(node, _Mutate):
+                if node.column not in needed:
+                    skipped.append(node)
+                    continue
+                if node.reads is None:
+                    everything = True
+                else:
+                    needed |= node.reads
+            else:
+                for i, member in enumerate(node.members):
+                    used = [var for var in member.variables
+                            if any(var + suffix in needed for suffix in member.suffixes)]
+                    if used != member.variables:
+                        member = node.members[i] = copy.copy(member)
+                        member.variables = used
+                needed -= set().union(*(set(member.new_columns) for member in node.members))
+                needed |= node.reads
+            kept.append(node)
+        kept.reverse()
+        skipped.reverse()
+
+        projection = None
+        if not everything:
+            projection = [col for col in self._obj.columns if col in needed]
+            if len(projection) == len(self._obj.columns):
+                projection = None
+        return projection, kept, skipped, columns
+
+    def explain(self):
+        """
+        Describe the optimized plan: the input columns that are taken, the steps in the order they
+        run (with fused shifts grouped together) and the mutations that are skipped.
+
+        Returns:
+        -------
+        str
+            The plan, one step per line.
+        """
+        projection, nodes, skipped, columns = self._plan()
+        lines = [f"LazyFrame plan: {len(self._steps)} steps, {len(nodes)} to run"]
+        if projection is None:
+            lines.append(f"{'input':<10}all {len(self._obj.columns)} columns")
+        else:
+            lines.append(f"{'input':<10}{len(projection)} of {len(self._obj.columns)} columns: {', '.join(map(str, projection))}")
+        lines.append(f"{'copy':<10}once")
+        lines += [node.describe() for node in nodes]
+        lines += [f"{'skipped':<10}{node.describe()} (unused)" for node in skipped]
+        lines.append(f"{'output':<10}{len(columns)} columns")
+        return "\n".join(lines)
+
+    @instrumented("lazy.collect")
+    def collect(self, n_jobs=None):
+        """
+        Execute the plan.
+
+        Parameters:
+        ----------
+        n_jobs : int, optional
+            The number of worker processes for the shifts, as in `df.chem.lag`. Defaults to None
+            (no workers).
+
+        Returns:
+        -------
+        pandas.DataFrame
+            The result of the recorded steps. It keeps the index of the input frame unless a shift
+            was applied, which gives a fresh RangeIndex (as in `df.chem.lag`).
+        """
+        with phase("plan"):
+            projection, nodes, _, columns = self._plan()
+
+        # One private copy; under Copy-on-Write it only allocates the columns that are written to
+        with phase("copy"):
+            df = safe_copy(self._obj) if projection is None else self._obj.reindex(columns=projection)
+
+        panels = {}
+        if self._panel is not None:
+            panels[self._panel[:2]] = self._panel[2]
+        rows_changed = False
+        for node in nodes:
+            if isinstance(node, _Select):
+                with phase("copy"):
+                    df = df.reindex(columns=node.columns)
+            elif isinstance(node, _Mutate):
+                node.run(df)
+            else:
+                df, changed = _run_group(df, node, panels, n_jobs)
+                rows_changed = rows_changed or changed
+
+        with phase("assign"):
+            if list(df.columns) != columns:
+                df = df.reindex(columns=columns)
+
+        if self._panel is not None and not rows_changed and {self._panel[0], self._panel[1]} <= set(df.columns):
+            set_declared_panel(df, self._panel)
+        return df
+
+
+def _fusable(nodes, step):
+    """The shift group that `step` can join, moving it past the mutations after the group, or None."""
+    for node in reversed(nodes):
+        if isinstance(node, _ShiftGroup):
+            return node if node.accepts(step) else None
+        if not isinstance(node, _Mutate) or node.pinned or node.reads is None:
+            return None
+        if node.writes & (step.reads | step.writes) or node.reads & step.writes:
+            return None
+    return None
+
+
+def _run_group(df, group, panels, n_jobs):
+    """Apply the shifts of a group to `df`; returns the new frame and whether the rows changed."""
+    identifier, time = group.identifier, group.time
+
+    conflict_columns = [col for col in df.columns if col in group.writes]
+    if conflict_columns:
+        with phase("copy"):
+            df = df.drop(columns=conflict_columns)
+
+    with phase("index"):
+        panel = panels.get((identifier, time))
+        if panel is None or not panel.matches(df[identifier], df[time]):
+            panel = panels[(identifier, time)] = PanelIndex(df[identifier], df[time])
+
+    shifts = list(dict.fromkeys(shift for member in group.members for shift in member.shifts))
+    with phase("shift"):
+        if n_jobs is None:
+            rows, takers = panel.shift_indexer(shifts)
+        else:
+            from .parallel import shift_indexer
+            rows, takers = shift_indexer(panel, shifts, n_jobs)
+
+    if rows is not None and len(group.members) > 1:
+        # Duplicate keys repeat rows, and every later shift looks up its rows in the repeated frame
+        for member in group.members:
+            single = _ShiftGroup(member)
+            df, _ = _run_group(df, single, panels, n_jobs)
+        return df, True
+
+    takers = dict(zip(shifts, takers))
+    with phase("shift"):
+        new_columns = {}
+        for member in group.members:
+            new_columns.update(shift_columns(df, member.variables, [takers[shift] for shift in member.shifts], member.suffixes))
+
+    with phase("copy"):
+        base = df if rows is None else df.take(rows)
+        base.index = pd.RangeIndex(len(base))
+
+    with phase("assign"):
+        df = concat_columns([base, pd.DataFrame(new_columns, index=base.index)])
+    if rows is None:
+        panels[(identifier, time)] = panel
+    else:
+        panels.pop((identifier, time), None)
+    return df, rows is not None
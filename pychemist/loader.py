@@ -0,0 +1,264 @@
+import hashlib
+import importlib.resources
+import os
+import threading
+from collections import OrderedDict
+
+from .expressions import CacheInfo
+from .profiling import instrumented, phase
+
+
+class DatasetRegistry:
+    """
+    The datasets that `load` can open by name: the bundled datasets plus any local parquet files
+    or directories registered with `register`.
+
+    The registry behaves like the list of names it replaces: `"financials" in datasets` and
+    `list(datasets)` still work.
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._disk_cache = {}
+
+    def register(self, name, path, *, disk_cache=False):
+        """
+        Add a parquet file or directory under `name`.
+
+        Parameters:
+        ----------
+        name : str
+            The name to load the dataset with.
+
+        path : str or os.PathLike
+            The parquet file or directory.
+
+        disk_cache : bool, default=False
+            If True, the first `load` converts the dataset to an uncompressed Arrow file in the cache
+            directory (`PYCHEMIST_CACHE_DIR`, by default `~/.cache/pychemist`), and later loads
+            memory-map that file instead of decoding the parquet again. The cached file is rebuilt
+            when the parquet file changes. This suits large datasets that don't fit the in-memory
+            cache.
+        """
+        if not isinstance(name, str):
+            raise TypeError("The dataset name needs to be a string.")
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"The file or directory '{path}' does not exist.")
+        self._sources[name] = os.fspath(path)
+        self._disk_cache[name] = bool(disk_cache)
+        table_cache.discard(name)
+
+    def unregister(self, name):
+        """Remove a dataset from the registry (and its tables from the in-memory cache)."""
+        if name not in self._sources:
+            raise ValueError(f"Dataset '{name}' does not exist.")
+        del self._sources[name]
+        del self._disk_cache[name]
+        table_cache.discard(name)
+
+    def source(self, name):
+        """The path (or the bundled resource) the dataset is read from."""
+        if name not in self._sources:
+            raise ValueError(f"Dataset '{name}' does not exist.")
+        return self._sources[name]
+
+    def _bundle(self, name):
+        self._sources[name] = importlib.resources.files("pychemist.data").joinpath(f"{name}.parquet")
+        self._disk_cache[name] = False
+
+    def __contains__(self, name):
+        return name in self._sources
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def __repr__(self):
+        return repr(list(self._sources))
+
+
+class TableCache:
+    """
+    Bounded LRU cache of the Arrow tables decoded by `load`, keyed by dataset, columns and filters.
+
+    Arrow tables are immutable, and `load` converts them to a new DataFrame on every call, so a
+    caller can't change what the cache holds. Tables larger than the bound are not cached.
+
+    Parameters:
+    ----------
+    maxbytes : int, default=512 MB
+        The maximum total size of the cached tables, in bytes.
+    """
+
+    def __init__(self, maxbytes=512 * 2 ** 20):
+        if not isinstance(maxbytes, int) or maxbytes < 0:
+            raise ValueError("The cache size needs to be a non-negative integer.")
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+
+    def info(self):
+        """Return the hits, misses, maximum size and current size of the cache, in bytes."""
+        return CacheInfo(self.hits, self.misses, self.maxbytes, self.nbytes)
+
+    def clear(self):
+        """Empty the cache and reset the hit and miss counters."""
+        with self._lock:
+            self._tables.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def discard(self, name):
+        """Remove every cached table of dataset `name`."""
+        with self._lock:
+            for key in [key for key in self._tables if key[0] == name]:
+                self.nbytes -= self._tables.pop(key).nbytes
+
+    def get(self, key):
+        """Return the cached table for `key`, or None."""
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+            return table
+
+    def record(self, hit):
+        """Count a load as a hit or a miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key, table):
+        """Add a table, evicting the least recently used tables beyond the size bound."""
+        with self._lock:
+            if key in self._tables or table.nbytes > self.maxbytes:
+                return
+            self._tables[key] = table
+            self.nbytes += table.nbytes
+            while self.nbytes > self.maxbytes:
+                _, evicted = self._tables.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+
+table_cache = TableCache()
+
+datasets = DatasetRegistry()
+datasets._bundle("financials")
+
+
+@instrumented("load")
+def load(name, columns=None, filters=None, *, cache=True):
+    """
+    Load a bundled or registered dataset as a DataFrame.
+
+    Parameters:
+    ----------
+    name : str
+        The dataset name, e.g. "financials". See `datasets` for the available names.
+
+    columns : list of str, optional
+        The columns to read. Only these columns are decoded. Defaults to all columns.
+
+    filters : list of tuple or pyarrow.compute.Expression, optional
+        Row filters pushed down to the parquet reader, in the format of `pandas.read_parquet`,
+        e.g. `[("year", ">=", 2015), ("ticker", "in", ["AAPL", "MSFT"])]`.
+
+    cache : bool, default=True
+        Whether to use the in-memory cache of decoded tables (`table_cache`). If the whole dataset
+        is cached, projections and filters are applied to the cached table.
+
+    Returns:
+    -------
+    pandas.DataFrame
+        A new DataFrame, which can be modified without affecting later loads.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    if name not in datasets:
+        raise ValueError(f"Dataset '{name}' does not exist.")
+    if isinstance(columns, str):
+        columns = [columns]
+    if filters is None or isinstance(filters, pc.Expression):
+        expression = filters
+    else:
+        expression = pq.filters_to_expression(filters) if len(filters) else None
+
+    key = (name, None if columns is None else tuple(columns), None if expression is None else str(expression))
+    with phase("cache"):
+        table = table_cache.get(key) if cache else None
+        if table is None and cache:
+            full = table_cache.get((name, None, None))
+            if full is not None:
+                table = full if expression is None else full.filter(expression)
+                table = table if columns is None else table.select(columns)
+        if cache:
+            table_cache.record(table is not None)
+    if table is not None:
+        return _to_pandas(table)
+
+    if datasets._disk_cache[name]:
+        with phase("read"):
+            table = _disk_cached_table(name)
+            table = table if expression is None else table.filter(expression)
+            table = table if columns is None else table.select(columns)
+        return _to_pandas(table)
+
+    source = datasets.source(name)
+    with phase("read"):
+        if isinstance(source, (str, os.PathLike)):
+            table = pq.read_table(source, columns=columns, filters=expression)
+        else:
+            with source.open("rb") as f:
+                table = pq.read_table(f, columns=columns, filters=expression)
+    if cache:
+        table_cache.put(key, table)
+    return _to_pandas(table)
+
+
+def _to_pandas(table):
+    with phase("convert"):
+        return table.to_pandas()
+
+
+def _cache_dir():
+    return os.environ.get("PYCHEMIST_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pychemist"))
+
+
+def _disk_cached_table(name):
+    """
+    Memory-map the Arrow file of a registered dataset, converting the parquet to it first if it's
+    missing or older than the parquet.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    source = datasets.source(name)
+    files = [source]
+    if os.path.isdir(source):
+        files = sorted(os.path.join(root, file) for root, _, names in os.walk(source) for file in names)
+    digest = hashlib.sha1(os.path.abspath(source).encode())
+    for file in files:
+        stat = os.stat(file)
+        digest.update(f"{file}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    fingerprint = digest.hexdigest()[:16]
+    path = os.path.join(_cache_dir(), f"{name}-{fingerprint}.arrow")
+
+    if not os.path.exists(path):
+        os.makedirs(_cache_dir(), exist_ok=True)
+        table = pq.read_table(source)
+        partial = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(partial, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(partial, path)
+
+    # The table references the mapped file rather than a copy of it
+    return pa.ipc.open_file(pa.memory_map(path)).read_all()
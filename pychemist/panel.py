@@ -0,0 +1,441 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from ._compat import copy_on_write, safe_copy, concat_columns
+from .profiling import phase
+
+# Largest key value used by the integer fast path (leaves headroom for the shift offsets).
+_MAX_KEY = 2 ** 62
+
+
+# Panels declared with `set_panel`, keyed by the identity of the DataFrame they belong to.
+_declared_panels = {}
+
+
+def get_declared_panel(dataframe):
+    """Return the (identifier, time, PanelIndex) declared for `dataframe`, or None."""
+    entry = _declared_panels.get(id(dataframe))
+    if entry is None or entry[0]() is not dataframe:
+        return None
+    return entry[1]
+
+
+def set_declared_panel(dataframe, panel):
+    """Attach an (identifier, time, PanelIndex) tuple to `dataframe` for as long as it is alive."""
+    key = id(dataframe)
+    if panel is None:
+        _declared_panels.pop(key, None)
+        return
+    reference = weakref.ref(dataframe, lambda _, key=key: _declared_panels.pop(key, None))
+    _declared_panels[key] = (reference, panel)
+
+
+def _shift_suffix(shift):
+    """Return the column suffix for a shift: _lag, _lag2, ... for lags and _lead, _lead2, ... for leads."""
+    if shift > 0:  # Lag
+        return f'_lag{shift}' if shift > 1 else '_lag'
+    return f'_lead{abs(shift)}' if abs(shift) > 1 else '_lead'
+
+
+def _shift_list(shift):
+    """Convert a single shift or a list of shifts to a list of unique integer shifts."""
+    shifts = list(shift) if isinstance(shift, (list, tuple)) else [shift]
+    if not shifts:
+        raise ValueError("You need to enter at least one shift value.")
+    for value in shifts:
+        if not isinstance(value, int):
+            raise TypeError("Shift value needs to be an integer")
+    return list(dict.fromkeys(shifts))
+
+
+class PanelIndex:
+    """
+    Sorted layout of a panel, used to look up the row at a fixed time distance within each unit.
+
+    The identifier column is factorized into integer codes and the rows are sorted once by
+    (identifier, time). A shift of `k` periods is then resolved positionally with a binary search
+    for `time - k` within the same unit, instead of hash-joining a shifted copy of the frame.
+
+    The matching rules are the ones of a left merge on [identifier, time]: a row without a
+    counterpart exactly `k` periods away gets a missing value, a row with several counterparts
+    (duplicate keys) is repeated once per match, and missing keys match each other.
+
+    Parameters:
+    ----------
+    ids : array-like
+        The unit or company identifier of every row.
+
+    times : array-like
+        The time period of every row.
+    """
+
+    def __init__(self, ids, times):
+        # Keep a snapshot of the key columns to validate cached indexes against later on.
+        ids = pd.Series(ids).reset_index(drop=True).copy(deep=not copy_on_write())
+        times = pd.Series(times).reset_index(drop=True).copy(deep=not copy_on_write())
+        if len(ids) != len(times):
+            raise ValueError("The identifier and time columns need to have the same length.")
+
+        self.n = len(ids)
+        self.ids = ids
+        self.times = times
+        self.codes, self.uniques = pd.factorize(ids, use_na_sentinel=False)
+        self.codes = self.codes.astype(np.int64, copy=False)
+        self.ngroups = len(self.uniques)
+
+        self._order = None
+        self._boundaries = None
+        self._keys = None
+        self._unique_keys = None
+        self._span = None
+
+        values = times.to_numpy()
+        if self.n and values.dtype.kind in "iu":
+            values = values.astype(np.int64, copy=False)
+            base = int(values.min())
+            span = int(values.max()) - base + 1
+            if self.ngroups * span < _MAX_KEY:
+                keys = self.codes * span + (values - base)
+                # An unstable sort is much faster and only differs from a stable one on duplicate
+                # keys, whose matches have to come out in their original row order.
+                order = np.argsort(keys)
+                sorted_keys = keys[order]
+                self._unique_keys = bool((sorted_keys[1:] != sorted_keys[:-1]).all())
+                if not self._unique_keys:
+                    order = np.argsort(keys, kind="stable")
+                    sorted_keys = keys[order]
+                self._order = order
+                self._keys = sorted_keys
+                self._span = span
+
+    @property
+    def order(self):
+        """The row positions sorted by (identifier, time); ties keep their original order."""
+        if self._order is None:
+            tcodes, _ = pd.factorize(self.times, sort=True, use_na_sentinel=False)
+            self._order = np.lexsort((tcodes, self.codes))
+        return self._order
+
+    @property
+    def boundaries(self):
+        """
+        The start of every unit in `order`, followed by the number of rows: the rows of the
+        i-th unit are `order[boundaries[i]:boundaries[i + 1]]`.
+        """
+        if self._boundaries is None:
+            sorted_codes = self.codes[self.order]
+            starts = np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+            self._boundaries = np.concatenate([[0], starts, [self.n]]) if self.n else np.zeros(1, dtype=np.int64)
+        return self._boundaries
+
+    def matches(self, ids, times):
+        """Check whether the index was built from these identifier and time values."""
+        if len(ids) != self.n or len(times) != self.n:
+            return False
+        ids = pd.Series(ids).reset_index(drop=True)
+        times = pd.Series(times).reset_index(drop=True)
+        return (ids.dtype == self.ids.dtype and times.dtype == self.times.dtype
+                and ids.equals(self.ids) and times.equals(self.times))
+
+    def _match(self, shift):
+        """
+        Return (order, lo, count): the rows `order[lo[i]:lo[i] + count[i]]` are the rows of the
+        same unit whose time equals the time of row `i` minus `shift`.
+        """
+        if self._keys is not None:
+            # Work in sorted order, where the targets `key - shift` are sorted as well and the
+            # binary searches walk the keys sequentially.
+            order, keys = self._order, self._keys
+            target = keys - shift
+            offset = keys % self._span - shift
+            valid = (offset >= 0) & (offset < self._span)
+            lo_sorted = keys.searchsorted(target, side="left")
+            if self._unique_keys:
+                found = keys[np.minimum(lo_sorted, self.n - 1)] == target
+                count_sorted = (valid & found).astype(np.int64)
+            else:
+                hi_sorted = keys.searchsorted(target, side="right")
+                count_sorted = np.where(valid, hi_sorted - lo_sorted, 0)
+            lo = np.empty_like(lo_sorted)
+            lo[order] = lo_sorted
+            count = np.empty_like(count_sorted)
+            count[order] = count_sorted
+            return order, lo, count
+
+        # Generic path (float, period, ... times): compare `time` with `time + shift` exactly as
+        # the merge does, through a joint factorization of both key sets.
+        shifted = self.times + shift
+        tcodes, tuniques = pd.factorize(pd.concat([self.times, shifted], ignore_index=True),
+                                        use_na_sentinel=False)
+        tcodes = tcodes.astype(np.int64, copy=False)
+        width = max(len(tuniques), 1)
+        left = self.codes * width + tcodes[:self.n]
+        right = self.codes * width + tcodes[self.n:]
+        order = np.argsort(right, kind="stable")
+        keys = right[order]
+        lo = keys.searchsorted(left, side="left")
+        count = keys.searchsorted(left, side="right") - lo
+        return order, lo, count
+
+    def window_bounds(self, window):
+        """
+        Compute the trailing time window of every row.
+
+        The window of a row holds the rows of the same unit whose time lies in
+        `(time - window, time]`, so it covers `window` periods rather than `window` rows, and a
+        missing period leaves a hole in every window that spans it. Times need to be integers
+        (or floats with integer values); rows with a missing time have no window.
+
+        Parameters:
+        ----------
+        window : int
+            The number of periods in the window, including the current one.
+
+        Returns:
+        -------
+        order : numpy.ndarray
+            The rows with a time, sorted by (identifier, time).
+
+        lo, hi : numpy.ndarray
+            For every position `j` in `order`, the window of row `order[j]` is `order[lo[j]:hi[j]]`.
+        """
+        if self._keys is not None:
+            order, keys, span, unique = self._order, self._keys, self._span, self._unique_keys
+        else:
+            times = self.times
+            if not pd.api.types.is_numeric_dtype(times) or pd.api.types.is_bool_dtype(times):
+                raise TypeError("Rolling windows need integer time periods.")
+            values = times.to_numpy(dtype=float, na_value=np.nan)
+            rows = np.flatnonzero(~np.isnan(values))
+            values = values[rows]
+            if (values != np.round(values)).any():
+                raise TypeError("Rolling windows need integer time periods.")
+            values = values.astype(np.int64)
+            base = int(values.min()) if len(values) else 0
+            span = int(values.max()) - base + 1 if len(values) else 1
+            if self.ngroups * span >= _MAX_KEY:
+                raise ValueError("The time periods span too wide a range for rolling windows.")
+            keys = self.codes[rows] * span + (values - base)
+            sort = np.argsort(keys, kind="stable")
+            order, keys = rows[sort], keys[sort]
+            unique = bool((keys[1:] != keys[:-1]).all())
+
+        # The window starts `window - 1` periods back, but not before the first period of the unit
+        lo = keys.searchsorted(keys - np.minimum(keys % span, window - 1), side="left")
+        hi = np.arange(1, len(keys) + 1) if unique else keys.searchsorted(keys, side="right")
+        return order, lo, hi
+
+    def shift_indexer(self, shifts):
+        """
+        Compute the row positions for one or more shifts.
+
+        Parameters:
+        ----------
+        shifts : list of int
+            The number of periods to shift. Positive values look backwards (lag), negative
+            values look forwards (lead).
+
+        Returns:
+        -------
+        rows : numpy.ndarray or None
+            Positions of the original rows in the output, or None if every row appears exactly
+            once and in its original position.
+
+        takers : list of numpy.ndarray
+            For every shift, the position of the source row for each output row, or -1 when
+            there is no match.
+        """
+        rows = None
+        takers = []
+        if self.n == 0:
+            return rows, [np.empty(0, dtype=np.int64) for _ in shifts]
+
+        last = self.n - 1
+        for shift in shifts:
+            order, lo, count = self._match(shift)
+            if rows is None and count.max() <= 1:
+                takers.append(np.where(count == 1, order[np.minimum(lo, last)], -1))
+                continue
+
+            # Duplicate keys: repeat each output row once per match, as a left merge does.
+            current = np.arange(self.n) if rows is None else rows
+            matches = count[current]
+            repeats = np.maximum(matches, 1)
+            expand = np.repeat(np.arange(len(current)), repeats)
+            within = np.arange(len(expand)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+            position = np.minimum(lo[current][expand] + within, last)
+            takers = [taker[expand] for taker in takers]
+            takers.append(np.where(matches[expand] > 0, order[position], -1))
+            rows = current[expand]
+
+        return rows, takers
+
+
+def shift_columns(dataframe, variables, takers, suffixes):
+    """
+    Build the shifted columns from the row positions computed by `PanelIndex.shift_indexer`.
+
+    Returns:
+    -------
+    dict
+        The new column names, in order, mapped to their values.
+    """
+    sources = []
+    for var in variables:
+        column = dataframe[var]
+        sources.append(column.to_numpy() if isinstance(column.dtype, np.dtype) else column.array)
+    new_columns = {}
+    for suffix, taker in zip(suffixes, takers):
+        for var, source in zip(variables, sources):
+            new_columns[var + suffix] = pd.api.extensions.take(source, taker, allow_fill=True)
+    return new_columns
+
+
+ROLLING_STATS = ["count", "sum", "mean", "var", "std"]
+
+
+def _unit_layout(lengths):
+    """
+    Lay out units of `lengths` consecutive rows for running sums that restart at every unit.
+
+    Units with lengths within a factor two share a block, a matrix with one column per unit and one
+    row per period (plus a leading row of zeros), as long as the longest of them. A running sum is
+    then one vectorized addition per row of the block, and the buffer stays below about twice the
+    number of rows however unbalanced the panel is.
+
+    Returns:
+    -------
+    base, stride : numpy.ndarray
+        For every row `j`, slot `base[j] + i * stride[j]` of the buffer holds the running sum of its
+        unit before (unit-wide) row `i`, and the value of row `j` goes to `base[j] + (j + 1) * stride[j]`.
+
+    blocks : list of tuple
+        The (start, periods, units) of every block in the buffer.
+
+    size : int
+        The size of the buffer.
+    """
+    _, size_class = np.frexp((lengths + 1).astype(float))
+    start = np.empty(len(lengths), dtype=np.int64)
+    stride = np.empty(len(lengths), dtype=np.int64)
+    blocks = []
+    size = 0
+    for cls in np.unique(size_class):
+        units = np.flatnonzero(size_class == cls)
+        periods = int(lengths[units].max()) + 1
+        start[units] = size + np.arange(len(units))
+        stride[units] = len(units)
+        blocks.append((size, periods, len(units)))
+        size += periods * len(units)
+    first = np.cumsum(lengths) - lengths
+    return np.repeat(start - first * stride, lengths), np.repeat(stride, lengths), blocks, size
+
+
+def rolling_columns(dataframe, variables, panel, window, stats, min_periods):
+    """
+    Compute trailing-window statistics with the windows of `PanelIndex.window_bounds`.
+
+    Every statistic is the difference of two running sums within the unit, so the cost is linear in
+    the number of rows whatever the window. The running sums restart at every unit, so the result
+    of a row only depends on the rows of its own unit, down to the last bit, and any partition of
+    the units gives the same values. The values are centered on their unit mean first, which keeps
+    the running sums small and the variances accurate. Missing values are left out; a window with
+    fewer than `min_periods` values gets a missing value, and a window without values a sum of 0,
+    as in `pandas.DataFrame.rolling`.
+
+    Returns:
+    -------
+    dict
+        The new column names (`<variable>_<stat><window>`), in order, mapped to their values.
+    """
+    order, lo, hi = panel.window_bounds(window)
+    group = panel.codes[order]
+    first = np.flatnonzero(np.concatenate([[True], group[1:] != group[:-1]])) if len(group) else group
+    base, stride, blocks, size = _unit_layout(np.diff(np.append(first, len(group))))
+    slots = base + (np.arange(len(group)) + 1) * stride
+    lo_slots, hi_slots = base + lo * stride, base + hi * stride
+
+    def window_sums(columns):
+        total = np.zeros((len(columns), size))
+        for row, column in zip(total, columns):
+            row[slots] = column
+        for start, periods, units in blocks:
+            block = total[:, start:start + periods * units].reshape(len(columns), periods, units)
+            for i in range(2, periods):
+                block[:, i] += block[:, i - 1]
+        return [row[hi_slots] - row[lo_slots] for row in total]
+
+    new_columns = {}
+    for var in variables:
+        values = dataframe[var].to_numpy(dtype=float, na_value=np.nan)[order]
+        present = ~np.isnan(values)
+        group_count = np.bincount(group, weights=present, minlength=panel.ngroups)
+        group_sum = np.bincount(group, weights=np.where(present, values, 0.0), minlength=panel.ngroups)
+        center = np.divide(group_sum, group_count, out=np.zeros(panel.ngroups), where=group_count > 0)[group]
+        centered = np.where(present, values - center, 0.0)
+
+        count, sum_centered, sum_squares = window_sums([present, centered, centered * centered])
+
+        enough = count >= min_periods
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var_values = np.maximum(sum_squares - sum_centered ** 2 / count, 0.0) / (count - 1)
+            results = {
+                "count": count,
+                "sum": np.where(count > 0, sum_centered + count * center, 0.0),
+                "mean": np.where(count > 0, sum_centered / count + center, np.nan),
+                "var": np.where(count > 1, var_values, np.nan),
+                "std": np.where(count > 1, np.sqrt(var_values), np.nan),
+            }
+        for stat in stats:
+            column = np.full(panel.n, np.nan)
+            column[order] = np.where(enough, results[stat], np.nan)
+            new_columns[f"{var}_{stat}{window}"] = column
+    return new_columns
+
+
+def shift_frame(dataframe, variables, panel, shifts, suffixes, n_jobs=None):
+    """
+    Attach shifted copies of `variables` to `dataframe`, one block of columns per shift.
+
+    Parameters:
+    ----------
+    dataframe : pandas.DataFrame
+        The input DataFrame, in the row order used to build `panel`.
+
+    variables : list of str
+        The columns to shift.
+
+    panel : PanelIndex
+        The panel layout of `dataframe`.
+
+    shifts : list of int
+        The number of periods to shift.
+
+    suffixes : list of str
+        The suffix of the new columns, one per shift.
+
+    n_jobs : int, optional
+        The number of worker processes to compute the row positions with (see `parallel.shift_indexer`).
+
+    Returns:
+    -------
+    pandas.DataFrame
+        A new DataFrame with a fresh RangeIndex, the original columns and the shifted columns.
+        Under Copy-on-Write the original columns are shared with `dataframe` rather than copied.
+    """
+    with phase("shift"):
+        if n_jobs is None:
+            rows, takers = panel.shift_indexer(shifts)
+        else:
+            from .parallel import shift_indexer
+            rows, takers = shift_indexer(panel, shifts, n_jobs)
+        new_columns = shift_columns(dataframe, variables, takers, suffixes)
+
+    with phase("copy"):
+        base = safe_copy(dataframe) if rows is None else dataframe.take(rows)
+        base.index = pd.RangeIndex(len(base))
+
+    with phase("assign"):
+        return concat_columns([base, pd.DataFrame(new_columns, index=base.index)])
@@ -0,0 +1,186 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .panel import PanelIndex, rolling_columns
+
+
+def n_workers(n_jobs, ngroups):
+    """
+    The number of worker processes for `n_jobs`: None or 1 runs serially, -1 uses every CPU.
+    Never more workers than there are units.
+    """
+    if n_jobs is None:
+        return 1
+    if not isinstance(n_jobs, int) or isinstance(n_jobs, bool) or n_jobs == 0 or n_jobs < -1:
+        raise ValueError("n_jobs needs to be a positive integer, -1 (all CPUs) or None.")
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    return max(1, min(n_jobs, ngroups))
+
+
+class _SharedArrays:
+    """
+    Numpy arrays in shared memory, passed to the worker processes by name instead of being pickled.
+
+    The blocks are released when the context exits.
+    """
+
+    def __init__(self):
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def empty(self, shape, dtype):
+        """Allocate a shared array; returns (spec, array), where the spec is passed to the workers."""
+        dtype = np.dtype(dtype)
+        block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self._blocks.append(block)
+        return (block.name, shape, dtype.str), np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    def put(self, array):
+        """Copy `array` to shared memory; returns its spec."""
+        spec, shared = self.empty(array.shape, array.dtype)
+        shared[...] = array
+        return spec
+
+
+def _attach(spec):
+    """Open a shared array in a worker; returns (block, array). Close the block when done."""
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _pool(workers):
+    # Forking a process that runs threads (pyarrow, numexpr, BLAS) can deadlock, so the workers
+    # are started from a fork server (or spawned where that isn't available).
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload(["pychemist.parallel"])
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def _partitions(codes, workers):
+    """
+    Hash-partition the rows by identifier code; returns the row positions sorted by partition
+    and the start of every partition, followed by the number of rows.
+    """
+    part = codes % workers
+    rows = np.argsort(part, kind="stable")
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(part, minlength=workers))])
+    return rows, bounds
+
+
+def _panel_arrays(panel):
+    """The identifier codes and the times of the panel as numeric arrays, or None if the times aren't numeric."""
+    times = panel.times.to_numpy()
+    if times.dtype.kind not in "iuf":
+        return None
+    return panel.codes, times
+
+
+def _shift_task(codes_spec, times_spec, rows_spec, start, stop, shifts, taker_specs):
+    """Compute the shifts of one partition and write the global source positions to the shared takers."""
+    blocks = []
+    try:
+        (block, codes), (block_t, times), (block_r, rows) = [_attach(spec) for spec in (codes_spec, times_spec, rows_spec)]
+        blocks += [block, block_t, block_r]
+        rows = rows[start:stop]
+        local_rows, takers = PanelIndex(codes[rows], times[rows]).shift_indexer(shifts)
+        if local_rows is not None:
+            return False
+        for spec, taker in zip(taker_specs, takers):
+            block, out = _attach(spec)
+            blocks.append(block)
+            out[rows] = np.where(taker >= 0, rows[np.maximum(taker, 0)], -1)
+        return True
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _rolling_task(codes_spec, times_spec, rows_spec, start, stop, value_specs, window, stats, min_periods, out_specs):
+    """Compute the rolling statistics of one partition and write them to the shared output columns."""
+    blocks = []
+    try:
+        (block, codes), (block_t, times), (block_r, rows) = [_attach(spec) for spec in (codes_spec, times_spec, rows_spec)]
+        blocks += [block, block_t, block_r]
+        rows = rows[start:stop]
+        frame = {}
+        for var, spec in value_specs.items():
+            block, values = _attach(spec)
+            blocks.append(block)
+            frame[var] = values[rows]
+        panel = PanelIndex(codes[rows], times[rows])
+        columns = rolling_columns(pd.DataFrame(frame), list(value_specs), panel, window, stats, min_periods)
+        for name, column in columns.items():
+            block, out = _attach(out_specs[name])
+            blocks.append(block)
+            out[rows] = column
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def shift_indexer(panel, shifts, n_jobs=None):
+    """
+    `PanelIndex.shift_indexer`, computed in `n_jobs` worker processes.
+
+    The rows are hash-partitioned by identifier code, so every unit is handled by one worker, and
+    the workers write the source positions of their rows to shared arrays. The result is identical
+    to the serial one; with duplicate (identifier, time) pairs, or times that aren't numeric, the
+    indexer is computed serially.
+    """
+    workers = n_workers(n_jobs, panel.ngroups)
+    arrays = _panel_arrays(panel)
+    if workers == 1 or arrays is None:
+        return panel.shift_indexer(shifts)
+
+    codes, times = arrays
+    rows, bounds = _partitions(codes, workers)
+    with _SharedArrays() as shared, _pool(workers) as pool:
+        specs = [shared.put(codes), shared.put(times), shared.put(rows)]
+        outputs = [shared.empty((panel.n,), np.int64) for _ in shifts]
+        futures = [pool.submit(_shift_task, *specs, bounds[i], bounds[i + 1], shifts, [spec for spec, _ in outputs])
+                   for i in range(workers)]
+        complete = all([future.result() for future in futures])
+        takers = [out.copy() for _, out in outputs]
+
+    if not complete:
+        return panel.shift_indexer(shifts)
+    return None, takers
+
+
+def rolling_columns_parallel(dataframe, variables, panel, window, stats, min_periods, n_jobs=None):
+    """`rolling_columns`, computed in `n_jobs` worker processes partitioned by identifier."""
+    workers = n_workers(n_jobs, panel.ngroups)
+    arrays = _panel_arrays(panel)
+    if workers == 1 or arrays is None:
+        return rolling_columns(dataframe, variables, panel, window, stats, min_periods)
+
+    codes, times = arrays
+    rows, bounds = _partitions(codes, workers)
+    names = [f"{var}_{stat}{window}" for var in variables for stat in stats]
+    with _SharedArrays() as shared, _pool(workers) as pool:
+        specs = [shared.put(codes), shared.put(times), shared.put(rows)]
+        value_specs = {var: shared.put(dataframe[var].to_numpy(dtype=float, na_value=np.nan)) for var in variables}
+        outputs = {name: shared.empty((panel.n,), float) for name in names}
+        futures = [pool.submit(_rolling_task, *specs, bounds[i], bounds[i + 1], value_specs, window, stats,
+                               min_periods, {name: spec for name, (spec, _) in outputs.items()})
+                   for i in range(workers)]
+        for future in futures:
+            future.result()
+        return {name: out.copy() for name, (_, out) in outputs.items()}
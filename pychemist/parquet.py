@@ -0,0 +1,130 @@
+from .panel import PanelIndex, _shift_list, _shift_suffix
+
+
+def time_shift_parquet(source, destination, variables, id, time, shift=1, *, batch_size=1_000_000):
+    """
+    Creates lagged or lead variables for a parquet dataset that doesn't fit in memory.
+
+    The dataset is read in batches of rows and written to `destination` as it goes. The rows have
+    to be sorted (grouped) by `id`: every batch is cut after its last complete unit, and the rows of
+    the unit that may continue in the next batch are carried over. Each complete unit is shifted
+    in memory with the same rules as `time_shift`, so peak memory depends on `batch_size` (and the
+    size of the largest unit), not on the size of the dataset.
+
+    Parameters:
+    ----------
+    source : str or list of str
+        A parquet file, a directory of parquet files or a list of files, read in order.
+
+    destination : str
+        The parquet file to write the result to.
+
+    variables : list of str
+        A list of column names for which lagged or lead variables will be created.
+
+    id : str
+        The unit or company identifier column name. The rows need to be sorted by it.
+
+    time : str
+        The time period identifier column name.
+
+    shift : int or list of int, default=1
+        The number of time periods to shift. Positive integers create lagged variables, while negative
+        integers create lead variables (e.g. `[1, 2, -1]` creates `_lag`, `_lag2` and `_lead`).
+
+    batch_size : int, default=1_000_000
+        The number of rows to read at a time.
+
+    Returns:
+    -------
+    int
+        The number of rows written.
+
+    Notes:
+    -----
+    - The new columns keep the Arrow type of the original columns, with nulls where there is no
+      row at the requested time distance.
+    - The pandas metadata of the source (index, dtypes) is not carried over.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    if isinstance(variables, str):
+        variables = [variables]
+    if not isinstance(variables, list):
+        raise TypeError("You need to enter a single variable or a list of variables.")
+    shifts = _shift_list(shift)
+    if 0 in shifts:
+        raise ValueError("Shift value cannot be equal to 0, as it would not change the data.")
+    if not isinstance(batch_size, int) or batch_size < 1:
+        raise ValueError("The batch size needs to be a positive integer.")
+
+    dataset = ds.dataset(source, format="parquet")
+    schema = dataset.schema.remove_metadata()
+    for var in variables + [id, time]:
+        if var not in schema.names:
+            raise KeyError(f"The variable `{var}` does not exist in the dataset.")
+
+    suffixes = [_shift_suffix(value) for value in shifts]
+    new_columns = [var + suffix for suffix in suffixes for var in variables]
+    conflict_columns = [col for col in new_columns if col in schema.names]
+    if conflict_columns:
+        raise ValueError(f"The following lag/lead columns already exist: {', '.join(conflict_columns)}")
+    for suffix in suffixes:
+        for var in variables:
+            schema = schema.append(pa.field(var + suffix, dataset.schema.field(var).type))
+
+    written = 0
+    carry = None
+    with pq.ParquetWriter(destination, schema) as writer:
+        for batch in _iter_batches(dataset.files, batch_size, dataset.schema.names):
+            if batch.num_rows == 0:
+                continue
+            table = pa.Table.from_batches([batch])
+            if carry is not None:
+                table = pa.concat_tables([carry, table])
+
+            ids = table.column(id).to_pandas()
+            if ids.isna().any() or not ids.is_monotonic_increasing:
+                raise ValueError(f"The dataset needs to be sorted by `{id}`, without missing values.")
+
+            # The last unit may continue in the next batch
+            split = int(ids.searchsorted(ids.iloc[-1], side="left"))
+            carry = table.slice(split)
+            if split > 0:
+                written += _write_shifted(writer, schema, table.slice(0, split), variables, id, time, shifts, suffixes)
+
+        if carry is not None:
+            written += _write_shifted(writer, schema, carry, variables, id, time, shifts, suffixes)
+
+    return written
+
+
+def _iter_batches(files, batch_size, columns):
+    """
+    Read the files batch by batch, in order. Unlike a dataset scan, the files are read
+    synchronously and without pre-buffering, so only the current batch is held in memory.
+    """
+    import pyarrow.parquet as pq
+
+    for path in files:
+        with pq.ParquetFile(path, pre_buffer=False) as parquet_file:
+            yield from parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+
+def _write_shifted(writer, schema, table, variables, id, time, shifts, suffixes):
+    """Shift the complete units in `table` and write them; returns the number of rows written."""
+    import pyarrow as pa
+
+    panel = PanelIndex(table.column(id).to_pandas(), table.column(time).to_pandas())
+    rows, takers = panel.shift_indexer(shifts)
+
+    result = table if rows is None else table.take(pa.array(rows))
+    for suffix, taker in zip(suffixes, takers):
+        indices = pa.array(taker, mask=taker < 0)
+        for var in variables:
+            result = result.append_column(var + suffix, table.column(var).take(indices))
+
+    writer.write_table(result.cast(schema))
+    return result.num_rows
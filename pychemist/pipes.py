@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+from .profiling import instrumented, phase
+
+SPLIT_OUTPUTS = ["list", "explode", "indicators"]
+
+
+@instrumented("split_pipe")
+def split_pipe(values, output="list", *, sep="|", prefix=None):
+    """
+    Split a column of delimited lists such as "1|2|3" in one vectorized pass.
+
+    This is the column version of `convert_pipe_list`: empty elements are dropped, and the elements
+    become integers if every element in the column is an integer (instead of deciding per cell).
+    The strings are split with Arrow kernels, without creating a Python list per row.
+
+    Parameters:
+    ----------
+    values : pandas.Series
+        The strings to split. Missing values are kept as missing (or as rows without elements).
+
+    output : str, default="list"
+        The shape of the result:
+        - "list": a Series of Arrow lists, with the same index as `values`.
+        - "explode": a Series with one row per element, repeating the index of its row. Rows
+          without elements are left out.
+        - "indicators": a DataFrame of sparse boolean columns, one per distinct element (sorted),
+          that are True where the row contains the element, like `Series.str.get_dummies`.
+
+    sep : str, default="|"
+        The delimiter.
+
+    prefix : str, optional
+        For output="indicators": put `<prefix>_` before the column names.
+
+    Returns:
+    -------
+    pandas.Series or pandas.DataFrame
+        The split values, as described under `output`.
+    """
+    if not isinstance(values, pd.Series):
+        raise TypeError("The values need to be a pandas Series.")
+    if output not in SPLIT_OUTPUTS:
+        raise ValueError(f"Unknown output '{output}'; choose from {', '.join(SPLIT_OUTPUTS)}.")
+    if not isinstance(sep, str) or not sep:
+        raise ValueError("The delimiter needs to be a non-empty string.")
+
+    with phase("split"):
+        array, tokens, rows = _split_tokens(values, sep)
+
+    with phase("assign"):
+        if output == "list":
+            return _list_series(values, array, tokens, rows)
+        if output == "explode":
+            return tokens.to_pandas().set_axis(values.index.take(rows)).rename(values.name)
+        return _indicator_frame(values, tokens, rows, prefix)
+
+
+def _split_tokens(values, sep):
+    """
+    The Arrow array of `values`, the non-empty elements in row order, and the row position of every
+    element.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = pa.Array.from_pandas(values)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if pa.types.is_dictionary(array.type):
+        # Categorical columns
+        array = array.dictionary_decode()
+    if pa.types.is_null(array.type):
+        array = array.cast(pa.string())
+    if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        subject = "The values need" if values.name is None else f"The variable `{values.name}` needs"
+        raise TypeError(f"{subject} to contain strings.")
+
+    lists = pc.split_pattern(array, sep)
+    tokens = pc.list_flatten(lists)
+    rows = pc.list_parent_indices(lists)
+    nonempty = pc.greater(pc.binary_length(tokens), 0)
+    tokens = tokens.filter(nonempty).cast(pa.string())
+    rows = rows.filter(nonempty).to_numpy().astype(np.intp)
+
+    # Integers if every element of the column is one, as convert_pipe_list does per cell
+    if len(tokens):
+        try:
+            tokens = pc.cast(tokens, pa.int64())
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return array, tokens, rows
+
+
+def _list_series(values, array, tokens, rows):
+    import pyarrow as pa
+
+    offsets = np.zeros(len(array) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(array)), out=offsets[1:])
+    if len(tokens) < 2 ** 31:
+        lists = pa.ListArray.from_arrays(pa.array(offsets.astype(np.int32)), tokens, mask=array.is_null())
+    else:
+        lists = pa.LargeListArray.from_arrays(pa.array(offsets), tokens, mask=array.is_null())
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=values.index, name=values.name)
+
+
+def _indicator_frame(values, tokens, rows, prefix):
+    import pyarrow.compute as pc
+    from scipy import sparse
+
+    # Number the distinct elements in sorted order
+    encoded = pc.dictionary_encode(tokens)
+    order = pc.sort_indices(encoded.dictionary).to_numpy()
+    rank = np.empty(len(order), dtype=np.intp)
+    rank[order] = np.arange(len(order))
+    codes = rank[encoded.indices.to_numpy()]
+    labels = encoded.dictionary.take(order).to_pylist()
+    if prefix is not None:
+        labels = [f"{prefix}_{label}" for label in labels]
+
+    # Repeated elements within a row add up to True
+    matrix = sparse.csc_matrix((np.ones(len(codes), dtype=bool), (rows, codes)), shape=(len(values), len(labels)))
+    return pd.DataFrame.sparse.from_spmatrix(matrix, index=values.index, columns=labels)
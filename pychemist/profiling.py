@@ -0,0 +1,200 @@
+import contextlib
+import functools
+import json
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+# The profiles that are recording; instrumented functions do no extra work while this is empty.
+_profiles = []
+_lock = threading.Lock()
+_local = threading.local()
+_no_phase = contextlib.nullcontext()
+
+
+class Profile:
+    """
+    Record the pychemist operations that run while the profile is active.
+
+    Every call of a public operation (`time_shift`, `mutate`, `case_when`, the `.chem` methods,
+    `ttest`, `ttest_table` and `load`) adds one record: the operation name, the
+    number of rows and columns going in and coming out, the wall time, the time spent in every
+    internal phase (such as "conflict check", "index", "shift", "copy" and "assign") and,
+    with `memory=True`, the peak number of bytes allocated. Operations called by another
+    operation are counted as part of the outer one.
+
+    Use it as a context manager, or call `start()` and `stop()`.
+
+    Parameters:
+    ----------
+    callback : callable, optional
+        A function that receives every record (a dict) as soon as the operation finishes, e.g. to
+        forward it to a logger or metrics system.
+
+    memory : bool, default=False
+        Whether to trace memory allocations with `tracemalloc` to record the peak bytes allocated
+        per operation. Tracing slows down allocations, so this is off by default.
+
+    Examples:
+    --------
+    >>> with pychemist.Profile() as profile:
+    ...     df = df.chem.lag(['net income'], 'ticker', 'year')
+    >>> profile.summary()
+    >>> profile.to_json("profile.json")
+    """
+
+    def __init__(self, callback=None, memory=False):
+        if callback is not None and not callable(callback):
+            raise TypeError("The callback needs to be callable.")
+        self.callback = callback
+        self.memory = memory
+        self.records = []
+        self._started_tracing = False
+
+    def start(self):
+        """Start recording; returns the profile."""
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        with _lock:
+            if self not in _profiles:
+                _profiles.append(self)
+        return self
+
+    def stop(self):
+        """Stop recording; the records are kept."""
+        with _lock:
+            if self in _profiles:
+                _profiles.remove(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def clear(self):
+        """Remove the records."""
+        self.records = []
+
+    def _add(self, record):
+        self.records.append(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def summary(self):
+        """
+        The totals per operation.
+
+        Returns:
+        -------
+        pandas.DataFrame
+            One row per operation with the number of calls, the rows processed, the total wall time
+            and the total time per phase (columns `phase: <name>`).
+        """
+        rows = {}
+        for record in self.records:
+            row = rows.setdefault(record["operation"], {"calls": 0, "rows": 0, "seconds": 0.0})
+            row["calls"] += 1
+            row["rows"] += record["rows"] or 0
+            row["seconds"] += record["seconds"]
+            for name, seconds in record["phases"].items():
+                row[f"phase: {name}"] = row.get(f"phase: {name}", 0.0) + seconds
+        return pd.DataFrame.from_dict(rows, orient="index").rename_axis("operation")
+
+    def to_dict(self):
+        """The records as a dict with a list of `operations`."""
+        return {"operations": [dict(record, phases=dict(record["phases"])) for record in self.records]}
+
+    def to_json(self, path=None, **kwargs):
+        """Dump the records to JSON; returns the JSON string, or writes it to `path` if given."""
+        text = json.dumps(self.to_dict(), **kwargs)
+        if path is None:
+            return text
+        with open(path, "w") as f:
+            f.write(text)
+
+
+def _shape(obj):
+    if isinstance(obj, pd.DataFrame):
+        return obj.shape[0], obj.shape[1], int(obj.memory_usage(index=False).sum())
+    if isinstance(obj, pd.Series):
+        return len(obj), 1, int(obj.memory_usage(index=False))
+    return None, None, None
+
+
+def instrumented(operation):
+    """
+    Record calls of the decorated function in the active profiles.
+
+    The input frame is the first argument, or the frame of a `.chem` accessor.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiles or getattr(_local, "record", None) is not None:
+                return func(*args, **kwargs)
+            return _record(operation, func, args, kwargs)
+        return wrapper
+    return decorate
+
+
+def _record(operation, func, args, kwargs):
+    source = getattr(args[0], "_obj", args[0]) if args else None
+    rows, columns, _ = _shape(source)
+    record = {"operation": operation, "rows": rows, "columns": columns, "seconds": None, "phases": {},
+              "output_rows": None, "output_columns": None, "output_bytes": None, "peak_bytes": None}
+    tracing = tracemalloc.is_tracing() and any(profile.memory for profile in _profiles)
+    if tracing:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    _local.record = record
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        _local.record = None
+
+    if tracing:
+        record["peak_bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+    # In-place operations return None: the output is the modified input
+    output = source if result is None and kwargs.get("inplace") else result
+    record["output_rows"], record["output_columns"], record["output_bytes"] = _shape(output)
+    for profile in list(_profiles):
+        profile._add(record)
+    return result
+
+
+def phase(name):
+    """
+    Time a phase of the current operation: `with phase("shift"): ...`.
+
+    Without an active profile this returns a shared no-op context manager.
+    """
+    if not _profiles:
+        return _no_phase
+    record = getattr(_local, "record", None)
+    if record is None:
+        return _no_phase
+    return _Phase(record["phases"], name)
+
+
+class _Phase:
+    __slots__ = ("phases", "name", "start")
+
+    def __init__(self, phases, name):
+        self.phases = phases
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + time.perf_counter() - self.start
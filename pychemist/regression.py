@@ -0,0 +1,318 @@
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import stats as _stats
+
+
+FE_PATTERN = r"(^|:)C\("
+
+
+class _SelectedParams:
+    """
+    A view of fitted statsmodels results that exposes only the selected parameters.
+
+    The results' own `summary` method runs on the view, so the header and the diagnostics are
+    computed as usual, from the full model, but only the selected rows are formatted.
+    """
+
+    def __init__(self, results, keep):
+        self._results = results
+        self._keep = keep
+        self.params = results.params[keep]
+        self.bse = results.bse[keep]
+        self.tvalues = results.tvalues[keep]
+        self.pvalues = results.pvalues[keep]
+
+    def __getattr__(self, name):
+        return getattr(self._results, name)
+
+    def conf_int(self, alpha=0.05):
+        return self._results.conf_int(alpha)[self._keep]
+
+
+def summary_no_fe(model, pattern=FE_PATTERN, alpha=0.05):
+    """
+    The summary of a fitted regression without the fixed-effect coefficients.
+
+    The fixed-effect parameters are selected by name before anything is formatted, and the
+    coefficient table is built from the other parameters only, so the time doesn't depend on the
+    number of dummies. If the results don't support this, the full summary is rendered and the
+    fixed-effect rows are filtered out of the text.
+
+    Parameters:
+    ----------
+    model : statsmodels results or AbsorbedOLSResults
+        The fitted regression.
+
+    pattern : str or re.Pattern, default=r"(^|:)C\\("
+        A regular expression that matches the names of the fixed-effect parameters (`re.search`).
+        The default matches `C(...)` terms, including interactions such as `x:C(firm)[T.1]` and
+        `C(firm, Treatment(0))[T.1]`. Use e.g. `r"^firm\\["` for string columns that patsy
+        encodes as categorical without `C()`.
+
+    alpha : float, default=0.05
+        The significance level of the confidence intervals.
+
+    Returns:
+    -------
+    str
+        The summary as text.
+    """
+    regex = re.compile(pattern)
+    params = model.params
+    names = list(params.index) if isinstance(params, pd.Series) else list(model.model.exog_names)
+    keep = np.array([regex.search(str(name)) is None for name in names], dtype=bool)
+    if keep.all():
+        return model.summary(alpha=alpha).as_text()
+
+    results = getattr(model, "_results", model)
+    try:
+        view = _SelectedParams(results, keep)
+        summary = type(results).summary(view, xname=[name for name, k in zip(names, keep) if k], alpha=alpha)
+        return summary.as_text()
+    except (AttributeError, TypeError):
+        # Results without a `summary(xname=...)` method, or whose summary needs more than the view offers
+        pass
+
+    # Filter out the lines whose first cell is the name of a fixed-effect parameter
+    summary_str = model.summary(alpha=alpha).as_text()
+    return "\n".join(line for line in summary_str.split("\n") if not regex.search(line.split("  ", 1)[0]))
+
+
+def _demean(matrix, codes, counts, tol=1e-10, maxiter=1000):
+    """
+    Subtract the fixed effects from every column of `matrix` (in place) by alternating projections.
+
+    Every sweep subtracts the group means of each fixed effect in turn; with a single fixed effect
+    one sweep is exact. The iteration stops when the largest group mean subtracted in a sweep is
+    below `tol` times the scale of the data.
+
+    Returns:
+    -------
+    int
+        The number of sweeps.
+    """
+    scale = max(np.abs(matrix).max(), 1.0) if matrix.size else 1.0
+    for iteration in range(1, maxiter + 1):
+        largest = 0.0
+        for code, count in zip(codes, counts):
+            for j in range(matrix.shape[1]):
+                means = np.bincount(code, weights=matrix[:, j], minlength=len(count)) / count
+                matrix[:, j] -= means[code]
+                largest = max(largest, np.abs(means).max())
+        if len(codes) == 1 or largest < tol * scale:
+            return iteration
+    warnings.warn(f"The fixed effects did not converge in {maxiter} iterations.", RuntimeWarning)
+    return maxiter
+
+
+def _absorbed_dof(codes, counts):
+    """
+    The number of parameters absorbed by the fixed effects.
+
+    Every level of the first fixed effect counts. For a second fixed effect, the levels minus the
+    number of connected components of the two (which are redundant) count, which is exact. Further
+    fixed effects count their levels minus one, which may overstate the number of parameters.
+    """
+    dof = len(counts[0])
+    if len(codes) > 1:
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        n0, n1 = len(counts[0]), len(counts[1])
+        edges = coo_matrix((np.ones(len(codes[0])), (codes[0], n0 + codes[1])), shape=(n0 + n1, n0 + n1))
+        components, _ = connected_components(edges.tocsr(), directed=False)
+        dof += n1 - components
+    for count in counts[2:]:
+        dof += len(count) - 1
+    return dof
+
+
+class AbsorbedOLSResults:
+    """
+    Results of `ols_fe`: the slope coefficients of an OLS regression with absorbed fixed effects.
+
+    The coefficients, standard errors and degrees of freedom equal those of the same regression
+    with one dummy variable per fixed-effect level (`y ~ x + C(firm)`), without the dummies.
+    `summary()` returns a statsmodels Summary, so `summary_no_fe` accepts these results as well.
+    """
+
+    def __init__(self, params, cov, nobs, df_resid, df_inference, use_t, ssr, tss, tss_within,
+                 resid, yname, cov_type, absorb, n_levels, iterations, n_clusters=None):
+        self.params = params
+        self.bse = pd.Series(np.sqrt(np.diag(cov)), index=params.index)
+        self.tvalues = self.params / self.bse
+        self.nobs = nobs
+        self.df_resid = df_resid
+        self.df_model = nobs - df_resid - 1
+        self.use_t = use_t
+        self.cov_type = cov_type
+        self.absorb = absorb
+        self.n_levels = n_levels
+        self.n_clusters = n_clusters
+        self.iterations = iterations
+        self.ssr = ssr
+        self.resid = resid
+        self.rsquared = 1 - ssr / tss
+        self.rsquared_adj = 1 - (nobs - 1) / df_resid * (1 - self.rsquared)
+        self.rsquared_within = 1 - ssr / tss_within
+        self._cov = pd.DataFrame(cov, index=params.index, columns=params.index)
+        self._df_inference = df_inference
+        self._yname = yname
+        if use_t:
+            self.pvalues = pd.Series(2 * _stats.t.sf(np.abs(self.tvalues), df_inference), index=params.index)
+        else:
+            self.pvalues = pd.Series(2 * _stats.norm.sf(np.abs(self.tvalues)), index=params.index)
+
+    def cov_params(self):
+        """The covariance matrix of the coefficients."""
+        return self._cov
+
+    def conf_int(self, alpha=0.05):
+        """The (1 - alpha) confidence intervals of the coefficients."""
+        if self.use_t:
+            q = _stats.t.ppf(1 - alpha / 2, self._df_inference)
+        else:
+            q = _stats.norm.ppf(1 - alpha / 2)
+        return pd.DataFrame({0: self.params - q * self.bse, 1: self.params + q * self.bse})
+
+    def summary(self, alpha=0.05):
+        """A statsmodels Summary of the regression, listing the slope coefficients only."""
+        from statsmodels.iolib.summary import Summary
+
+        absorbed = ", ".join(f"{name} ({count})" for name, count in zip(self.absorb, self.n_levels))
+        left = [("Dep. Variable:", [self._yname]),
+                ("Model:", ["OLS"]),
+                ("Method:", ["Least Squares"]),
+                ("Date:", None),
+                ("Time:", None),
+                ("No. Observations:", [f"{self.nobs:d}"]),
+                ("Df Residuals:", [f"{self.df_resid:d}"]),
+                ("Df Model:", [f"{self.df_model:d}"]),
+                ("Covariance Type:", [self.cov_type])]
+        right = [("R-squared:", [f"{self.rsquared:#8.3f}"]),
+                 ("Adj. R-squared:", [f"{self.rsquared_adj:#8.3f}"]),
+                 ("Within R-squared:", [f"{self.rsquared_within:#8.3f}"]),
+                 ("Absorbed FE:", [absorbed])]
+        if self.n_clusters is not None:
+            right.append(("No. Clusters:", [f"{self.n_clusters:d}"]))
+
+        summary = Summary()
+        xname = list(self.params.index)
+        summary.add_table_2cols(self, gleft=left, gright=right, yname=self._yname, xname=xname,
+                                title="OLS Regression Results (absorbed fixed effects)")
+        summary.add_table_params(self, yname=self._yname, xname=xname, alpha=alpha, use_t=self.use_t)
+        return summary
+
+
+def ols_fe(formula, data, absorb, cluster=None, *, use_t=None, tol=1e-10, maxiter=1000):
+    """
+    OLS regression with absorbed fixed effects.
+
+    Instead of adding one dummy variable per level (`C(firm)`), the fixed effects are removed from the
+    dependent and independent variables by iterative demeaning (alternating projections) over the
+    factorized group codes. Only the slope coefficients are estimated, with the degrees of freedom of
+    the regression with dummies.
+
+    Parameters:
+    ----------
+    formula : str
+        A patsy formula such as `"y ~ x1 + x2"`. The intercept is absorbed by the fixed effects.
+
+    data : pandas.DataFrame
+        The input DataFrame. Rows with missing values in any of the used columns are dropped.
+
+    absorb : str or list of str
+        The fixed-effect column(s), e.g. `"firm"` or `["firm", "year"]`.
+
+    cluster : str, optional
+        The column to cluster the standard errors on. If None, the standard errors are not robust.
+
+    use_t : bool, optional
+        Whether the p-values and confidence intervals use the t distribution. Defaults to True for
+        non-robust and False for clustered standard errors, as in statsmodels. With clustered standard
+        errors, the t distribution has (number of clusters - 1) degrees of freedom.
+
+    tol : float, default=1e-10
+        The convergence tolerance of the demeaning with multiple fixed effects.
+
+    maxiter : int, default=1000
+        The maximum number of demeaning sweeps.
+
+    Returns:
+    -------
+    AbsorbedOLSResults
+        The estimation results.
+    """
+    import patsy
+
+    if isinstance(absorb, str):
+        absorb = [absorb]
+    if not isinstance(absorb, list) or not absorb:
+        raise TypeError("The 'absorb' argument needs to be a column name or a list of column names.")
+    for var in absorb + ([cluster] if cluster is not None else []):
+        if var not in data:
+            raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
+
+    # Drop rows with missing fixed effects or clusters first, patsy drops the other missing values
+    keys = absorb + ([cluster] if cluster is not None and cluster not in absorb else [])
+    df = data.reset_index(drop=True)
+    df = df[df[keys].notna().all(axis=1)]
+    y, X = patsy.dmatrices(formula, df, return_type="dataframe")
+    X = X.drop(columns=["Intercept"], errors="ignore")
+    df = df.loc[y.index]
+
+    codes, counts = [], []
+    for var in absorb:
+        code, uniques = pd.factorize(df[var])
+        codes.append(code)
+        counts.append(np.bincount(code, minlength=len(uniques)).astype(float))
+
+    yname = y.columns[0]
+    y_values = y.to_numpy(dtype=float)[:, 0]
+    matrix = np.column_stack([y_values, X.to_numpy(dtype=float)])
+    original_norms = np.sqrt((matrix ** 2).sum(axis=0))
+    iterations = _demean(matrix, codes, counts, tol=tol, maxiter=maxiter)
+    y_dm, X_dm = matrix[:, 0], matrix[:, 1:]
+
+    # Variables that are (nearly) constant within the fixed effects are not identified
+    norms = np.sqrt((X_dm ** 2).sum(axis=0))
+    keep = norms > 1e-8 * np.maximum(original_norms[1:], 1.0)
+    if not keep.all():
+        omitted = ", ".join(X.columns[~keep])
+        warnings.warn(f"The following variables are collinear with the fixed effects and were omitted: {omitted}")
+        X, X_dm = X.loc[:, keep], X_dm[:, keep]
+
+    nobs, k = X_dm.shape
+    bread = np.linalg.pinv(X_dm.T @ X_dm)
+    beta = bread @ (X_dm.T @ y_dm)
+    resid = y_dm - X_dm @ beta
+    ssr = float(resid @ resid)
+
+    df_resid = nobs - k - _absorbed_dof(codes, counts)
+    if df_resid <= 0:
+        raise ValueError("There are not enough observations to estimate the model.")
+
+    if cluster is None:
+        cov = bread * ssr / df_resid
+        cov_type, n_clusters, df_inference = "nonrobust", None, df_resid
+        use_t = True if use_t is None else use_t
+    else:
+        groups, uniques = pd.factorize(df[cluster])
+        n_clusters = len(uniques)
+        scores = np.column_stack([np.bincount(groups, weights=X_dm[:, j] * resid, minlength=n_clusters)
+                                  for j in range(k)])
+        correction = n_clusters / (n_clusters - 1) * (nobs - 1) / df_resid
+        cov = correction * bread @ (scores.T @ scores) @ bread
+        cov_type, df_inference = "cluster", n_clusters - 1
+        use_t = False if use_t is None else use_t
+
+    tss = float(((y_values - y_values.mean()) ** 2).sum())
+    tss_within = float(y_dm @ y_dm)
+    return AbsorbedOLSResults(
+        params=pd.Series(beta, index=X.columns), cov=cov, nobs=nobs, df_resid=df_resid,
+        df_inference=df_inference, use_t=use_t, ssr=ssr, tss=tss, tss_within=tss_within,
+        resid=pd.Series(resid, index=data.index[y.index.to_numpy()]), yname=yname, cov_type=cov_type, absorb=absorb,
+        n_levels=[len(count) for count in counts], iterations=iterations, n_clusters=n_clusters)
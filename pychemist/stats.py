@@ -0,0 +1,416 @@
+import numpy as np
+import pandas as pd
+from scipy import stats as _stats
+
+from .profiling import instrumented, phase
+
+TTEST_METHODS = ["parametric", "permutation", "bootstrap"]
+
+
+def _t_values(n1, mean1, var1, n0, mean0, var0, equal_var=True):
+    """The difference in means, the t-value and the degrees of freedom of `_t_statistics`, without the p-value."""
+    n1, mean1, var1 = (np.asarray(x, dtype=float) for x in (n1, mean1, var1))
+    n0, mean0, var0 = (np.asarray(x, dtype=float) for x in (n0, mean0, var0))
+
+    diff = mean1 - mean0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if equal_var:
+            dof = n1 + n0 - 2
+            pooled = ((n1 - 1) * var1 + (n0 - 1) * var0) / dof
+            se = np.sqrt(pooled * (1 / n1 + 1 / n0))
+        else:
+            v1, v0 = var1 / n1, var0 / n0
+            se = np.sqrt(v1 + v0)
+            dof = (v1 + v0) ** 2 / (v1 ** 2 / (n1 - 1) + v0 ** 2 / (n0 - 1))
+        t = diff / se
+    return diff, t, dof
+
+
+def _t_statistics(n1, mean1, var1, n0, mean0, var0, equal_var=True):
+    """
+    Two-sample t-test from group sufficient statistics (vectorized over arrays of groups).
+
+    The variances are sample variances (ddof=1). With `equal_var=True` this is Student's t-test
+    with a pooled variance, otherwise Welch's t-test.
+
+    Returns:
+    -------
+    tuple of numpy.ndarray
+        The difference in means (1 - 0), the t-value, the degrees of freedom and the two-sided p-value.
+    """
+    diff, t, dof = _t_values(n1, mean1, var1, n0, mean0, var0, equal_var)
+    p = 2 * _stats.t.sf(np.abs(t), dof)
+    return diff, t, dof, p
+
+
+@instrumented("ttest_table")
+def ttest_table(dataframe, variables, treatment, *, equal_var=True, method="parametric", n_resamples=9999,
+                seed=None, max_memory=2 ** 28, n_jobs=None):
+    """
+    Compare the means of many variables between treated (1) and control (0) observations.
+
+    For every treatment column, the counts, means and variances of all variables are computed in a
+    single grouped aggregation, and the t-values and p-values are derived from these statistics.
+    Missing values are left out per variable; rows with a treatment other than 0 or 1 are ignored.
+
+    Parameters:
+    ----------
+    dataframe : pandas.DataFrame
+        The input DataFrame.
+
+    variables : str or list of str
+        The variables to test.
+
+    treatment : str or list of str
+        The treatment indicator columns, with 1 for the treated and 0 for the control group.
+
+    equal_var : bool, default=True
+        If True, perform Student's t-test with a pooled variance (as `scipy.stats.ttest_ind`).
+        If False, perform Welch's t-test.
+
+    method : str, default="parametric"
+        How the p-value is computed:
+        - "parametric": from the t-distribution.
+        - "permutation": from the t-values of `n_resamples` random reassignments of the treatment
+          labels (the group sizes stay the same).
+        - "bootstrap": from the t-values of `n_resamples` bootstrap samples drawn within each group,
+          after shifting both groups to the overall mean (so that the null hypothesis holds).
+        The resampled p-values are (1 + the number of resamples with an absolute t-value at least as
+        large as the observed one) / (1 + n_resamples), and don't rely on normally distributed data.
+
+    n_resamples : int, default=9999
+        The number of permutations or bootstrap samples.
+
+    seed : int or numpy.random.SeedSequence, optional
+        The seed for the resamples. The p-values are reproducible for the same seed and `max_memory`.
+
+    max_memory : int, default=2**28
+        The resamples are drawn in blocks of at most this many bytes (256 MB); each block has its own
+        random stream, spawned from `seed`.
+
+    n_jobs : int, optional
+        The number of worker processes to spread the blocks over, or -1 for one per CPU. The p-values
+        don't depend on the number of workers. Defaults to None (no workers).
+
+    Returns:
+    -------
+    pandas.DataFrame
+        One row per treatment and variable, with the group sizes (`n_1`, `n_0`), the group means
+        (`mean_1`, `mean_0`), their difference (`diff`), the t-value (`t`) and the two-sided p-value (`p`).
+    """
+    if isinstance(variables, str):
+        variables = [variables]
+    if isinstance(treatment, str):
+        treatment = [treatment]
+    if not isinstance(variables, list) or not isinstance(treatment, list):
+        raise TypeError("The variables and treatment need to be a single column name or a list of column names.")
+    if not isinstance(equal_var, bool):
+        raise TypeError("The 'equal_var' argument must be a boolean (True or False).")
+    if method not in TTEST_METHODS:
+        raise ValueError(f"Unknown method '{method}'; choose from {', '.join(TTEST_METHODS)}.")
+    if method != "parametric":
+        if not isinstance(n_resamples, int) or isinstance(n_resamples, bool) or n_resamples < 1:
+            raise ValueError("n_resamples needs to be a positive integer.")
+        if not isinstance(max_memory, int) or max_memory < 1:
+            raise ValueError("max_memory needs to be a positive number of bytes.")
+
+    for var in variables + treatment:
+        if var not in dataframe:
+            raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
+
+    seeds = np.random.SeedSequence(seed) if not isinstance(seed, np.random.SeedSequence) else seed
+    tables = []
+    for treat in treatment:
+        with phase("aggregate"):
+            n, mean, var = _group_statistics(dataframe, variables, treat)
+        with phase("test"):
+            table = _ttest_frame(treat, variables, n, mean, var, equal_var)
+        if method != "parametric":
+            with phase("resample"):
+                table["p"] = _resampled_p(dataframe, variables, treat, table["t"].to_numpy(), method,
+                                          n_resamples, seeds, equal_var, max_memory, n_jobs)
+        tables.append(table)
+
+    return pd.concat(tables, ignore_index=True)
+
+
+def _group_statistics(dataframe, variables, treat):
+    """
+    Count, mean and sample variance of every variable for the treated (row 0) and the control
+    group (row 1), as arrays of shape (2, len(variables)), from a single grouped aggregation.
+    """
+    # Group code 1 (treated), 0 (control) or NaN (ignored, dropped by groupby)
+    groups = np.where(dataframe[treat] == 1, 1.0, np.where(dataframe[treat] == 0, 0.0, np.nan))
+    summary = dataframe[variables].groupby(groups).agg(["count", "mean", "var"]).reindex([1.0, 0.0])
+
+    n = summary.xs("count", axis=1, level=1).fillna(0).to_numpy(dtype=float)
+    mean = summary.xs("mean", axis=1, level=1).to_numpy(dtype=float)
+    var = summary.xs("var", axis=1, level=1).to_numpy(dtype=float)
+    return n, mean, var
+
+
+def _ttest_frame(treat, variables, n, mean, var, equal_var):
+    """The rows of `ttest_table` for one treatment column, from the output of `_group_statistics`."""
+    diff, t, _, p = _t_statistics(n[0], mean[0], var[0], n[1], mean[1], var[1], equal_var)
+    return pd.DataFrame({
+        "treatment": treat,
+        "variable": variables,
+        "n_1": n[0].astype(np.int64),
+        "n_0": n[1].astype(np.int64),
+        "mean_1": mean[0],
+        "mean_0": mean[1],
+        "diff": diff,
+        "t": t,
+        "p": p,
+    })
+
+
+def _resampled_p(dataframe, variables, treat, t_observed, method, n_resamples, seeds, equal_var, max_memory, n_jobs):
+    """
+    Permutation or bootstrap p-values of the t-values of one treatment column.
+
+    Variables with the same missing values share their resamples: their observations are stacked
+    into a matrix and every block of resamples is applied to all of them with one matrix product.
+    """
+    groups = dataframe[treat]
+    valid = ((groups == 1) | (groups == 0)).to_numpy()
+    missing = dataframe[variables].isna().to_numpy()
+
+    # Variables with the same missing values, in order of first appearance
+    patterns = {}
+    for i in range(len(variables)):
+        patterns.setdefault(missing[:, i].tobytes(), []).append(i)
+
+    p = np.full(len(variables), np.nan)
+    for columns in patterns.values():
+        rows = valid & ~missing[:, columns[0]]
+        values = dataframe[[variables[i] for i in columns]].to_numpy(dtype=float)[rows]
+        treated = (groups.to_numpy()[rows] == 1)
+        observed = np.abs(t_observed[columns])
+        if treated.sum() < 2 or (~treated).sum() < 2 or np.isnan(observed).all():
+            continue
+        exceed = _resample(values, treated, observed, method, n_resamples, seeds, equal_var, max_memory, n_jobs)
+        p[columns] = np.where(np.isnan(observed), np.nan, (1 + exceed) / (1 + n_resamples))
+    return p
+
+
+def _resample(values, treated, observed, method, n_resamples, seeds, equal_var, max_memory, n_jobs):
+    """The number of resamples with an absolute t-value of at least `observed`, per column of `values`."""
+    from .parallel import n_workers, _pool, _SharedArrays
+
+    # Center on the overall mean (this doesn't change the t-values), which keeps the sums of squares accurate
+    values = values - values.mean(axis=0)
+    if method == "bootstrap":
+        # Shift both groups to the overall mean, so that the null hypothesis holds in the resamples
+        values[treated] -= values[treated].mean(axis=0)
+        values[~treated] -= values[~treated].mean(axis=0)
+    moments = np.concatenate([values, values ** 2], axis=1)
+
+    # Every block holds two (resamples x rows) matrices: random keys and labels, or draws and bootstrap counts
+    size = int(max(1, min(n_resamples, max_memory // (16 * len(values)))))
+    sizes = [size] * (n_resamples // size) + ([n_resamples % size] if n_resamples % size else [])
+    blocks = list(zip(seeds.spawn(len(sizes)), sizes))
+
+    workers = n_workers(n_jobs, len(blocks))
+    if workers == 1:
+        counts = [_resample_block(method, seed, block, moments, treated, observed, equal_var) for seed, block in blocks]
+    else:
+        with _SharedArrays() as shared, _pool(workers) as pool:
+            specs = shared.put(moments), shared.put(treated)
+            counts = list(pool.map(_shared_resample_block, *zip(*[(method, seed, block, specs, observed, equal_var)
+                                                                    for seed, block in blocks])))
+    return np.sum(counts, axis=0)
+
+
+def _shared_resample_block(method, seed, size, specs, observed, equal_var):
+    """`_resample_block` in a worker process, on the moments and labels in shared memory."""
+    from .parallel import _attach
+
+    (moments_block, moments), (treated_block, treated) = (_attach(spec) for spec in specs)
+    try:
+        return _resample_block(method, seed, size, moments, treated, observed, equal_var)
+    finally:
+        moments_block.close()
+        treated_block.close()
+
+
+def _resample_block(method, seed, size, moments, treated, observed, equal_var):
+    """
+    Draw `size` resamples from the random stream `seed` and count, per variable, the resamples with
+    an absolute t-value of at least `observed`.
+
+    `moments` holds the (centered) values of k variables followed by their squares, so that a matrix
+    of group labels or bootstrap counts times `moments` gives the sums and sums of squares of every
+    resample at once.
+    """
+    rng = np.random.default_rng(seed)
+    k = moments.shape[1] // 2
+    n1, n0 = int(treated.sum()), int((~treated).sum())
+
+    if method == "permutation":
+        # Random sort keys: the n1 rows with the smallest keys of a resample form its treated group,
+        # which is a uniform random relabeling with the same group sizes
+        keys = rng.random((size, len(treated)))
+        kth = np.partition(keys, n1 - 1, axis=1)[:, n1 - 1:n1]
+        labels = (keys <= kth).astype(float)
+        del keys
+        sums1 = labels @ moments
+        sums0 = moments.sum(axis=0) - sums1
+    else:
+        # Bootstrap counts: how often every observation is drawn within its own group
+        sums = []
+        for group, n_group in ((treated, n1), (~treated, n0)):
+            draws = rng.integers(0, n_group, size=(size, n_group)) + (np.arange(size) * n_group)[:, None]
+            counts = np.bincount(draws.ravel(), minlength=size * n_group).reshape(size, n_group)
+            del draws
+            sums.append(counts.astype(float) @ moments[group])
+        sums1, sums0 = sums
+
+    mean1, mean0 = sums1[:, :k] / n1, sums0[:, :k] / n0
+    var1 = (sums1[:, k:] - n1 * mean1 ** 2) / (n1 - 1)
+    var0 = (sums0[:, k:] - n0 * mean0 ** 2) / (n0 - 1)
+    _, t, _ = _t_values(n1, mean1, np.maximum(var1, 0), n0, mean0, np.maximum(var0, 0), equal_var)
+    # A relative tolerance, so that resamples equal to the observed sample count as at least as extreme
+    return (np.abs(t) >= observed * (1 - 1e-12)).sum(axis=0)
+
+
+class TTestAccumulator:
+    """
+    Mergeable sufficient statistics for `ttest_table` on data that doesn't fit in memory.
+
+    The accumulator keeps, per treatment column, group and variable, the number of observations,
+    the mean and the sum of squared deviations from the mean. Chunks are combined with the
+    numerically stable parallel update of Chan et al., so memory use doesn't depend on the number
+    of rows, and accumulators filled in separate processes can be merged (they are picklable).
+
+    Parameters:
+    ----------
+    variables : str or list of str
+        The variables to test.
+
+    treatment : str or list of str
+        The treatment indicator columns, with 1 for the treated and 0 for the control group.
+
+    Examples:
+    --------
+    >>> acc = TTestAccumulator(["size", "roa"], "treated")
+    >>> acc.update(pd.read_parquet(path, columns=["size", "roa", "treated"]) for path in paths)
+    >>> acc.result(equal_var=False)
+    """
+
+    def __init__(self, variables, treatment):
+        if isinstance(variables, str):
+            variables = [variables]
+        if isinstance(treatment, str):
+            treatment = [treatment]
+        if not isinstance(variables, list) or not isinstance(treatment, list):
+            raise TypeError("The variables and treatment need to be a single column name or a list of column names.")
+
+        self.variables = variables
+        self.treatment = treatment
+        shape = (len(treatment), 2, len(variables))
+        self.n = np.zeros(shape)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def update(self, data):
+        """
+        Add the observations of a DataFrame, or of every DataFrame in an iterable of chunks.
+
+        Returns:
+        -------
+        TTestAccumulator
+            The accumulator itself, to allow chaining.
+        """
+        if not isinstance(data, pd.DataFrame):
+            for chunk in data:
+                self.update(chunk)
+            return self
+
+        for var in self.variables + self.treatment:
+            if var not in data:
+                raise KeyError(f"The variable `{var}` does not exist in the DataFrame.")
+
+        for i, treat in enumerate(self.treatment):
+            n, mean, var = _group_statistics(data, self.variables, treat)
+            m2 = np.where(n > 1, var * (n - 1), 0.0)
+            self._combine(i, n, np.nan_to_num(mean), m2)
+        return self
+
+    def merge(self, other):
+        """
+        Add the statistics of another accumulator for the same variables and treatments.
+
+        Returns:
+        -------
+        TTestAccumulator
+            The accumulator itself, to allow chaining.
+        """
+        if not isinstance(other, TTestAccumulator):
+            raise TypeError("Only a TTestAccumulator can be merged.")
+        if other.variables != self.variables or other.treatment != self.treatment:
+            raise ValueError("The accumulators need to have the same variables and treatment columns.")
+
+        for i in range(len(self.treatment)):
+            self._combine(i, other.n[i], other.mean[i], other.m2[i])
+        return self
+
+    def _combine(self, i, n, mean, m2):
+        n_a, mean_a, m2_a = self.n[i], self.mean[i], self.m2[i]
+        total = n_a + n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(total > 0, n / total, 0.0)
+        delta = mean - mean_a
+        self.mean[i] = mean_a + delta * share
+        self.m2[i] = m2_a + m2 + delta ** 2 * n_a * share
+        self.n[i] = total
+
+    def result(self, equal_var=True):
+        """
+        Compute the t-tests from the accumulated statistics.
+
+        Parameters:
+        ----------
+        equal_var : bool, default=True
+            If True, perform Student's t-test with a pooled variance. If False, perform Welch's t-test.
+
+        Returns:
+        -------
+        pandas.DataFrame
+            The same table as `ttest_table` would return on all the data at once.
+        """
+        if not isinstance(equal_var, bool):
+            raise TypeError("The 'equal_var' argument must be a boolean (True or False).")
+
+        tables = []
+        for i, treat in enumerate(self.treatment):
+            n = self.n[i]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mean = np.where(n > 0, self.mean[i], np.nan)
+                var = np.where(n > 1, self.m2[i] / (n - 1), np.nan)
+            tables.append(_ttest_frame(treat, self.variables, n, mean, var, equal_var))
+
+        return pd.concat(tables, ignore_index=True)
+
+
+@instrumented("ttest")
+def ttest(dataframe,variable,treatment,*,method="parametric",n_resamples=9999,seed=None,n_jobs=None):
+    """
+    Input: variable to test, and group variable, dataframe
+    Print variable name, mean treatment group (1), mean base group (0), difference between groups, t-value and significance
+
+    With method="permutation" or method="bootstrap", the significance is computed from `n_resamples`
+    resamples instead of the t-distribution (see `ttest_table`); pass `seed` for reproducible results
+    and `n_jobs` to draw the resamples in several worker processes.
+    """
+    result = ttest_table(dataframe, [variable], [treatment], method=method, n_resamples=n_resamples, seed=seed,
+                         n_jobs=n_jobs).iloc[0]
+    print(f"T-test for {variable}, grouped by {treatment}:\n")
+    print(f"Mean for {treatment} (1): {result['mean_1']:.3f}")
+    print(f"Mean for {treatment} (0): {result['mean_0']:.3f}\n")
+    print(f"Difference: {result['diff']:.3f}")
+    print(f"T-value: {result['t']:.3f}")
+    if method == "parametric":
+        print(f"Signficance: {result['p']:.3f}")
+    else:
+        print(f"Signficance ({method}, {n_resamples} resamples): {result['p']:.3f}")
@@ -90,4 +90,183 @@ def test_lag_expected_output():
     result.reset_index(drop=True)
     expected.reset_index(drop=True)
 
-    pdt.assert_frame_equal(result, expected)
\ No newline at end of file
+    pdt.assert_frame_equal(result, expected)
+
+def test_lag_multiple_horizons_matches_chained_calls():
+    df = pd.DataFrame({'company': ['A', 'A', 'A', 'A', 'B', 'B', 'B'],
+                       'year': [2017, 2018, 2019, 2021, 2018, 2019, 2020],
+                       'profit': [1, 2, 3, 4, 5, 6, 7]})
+
+    result = df.chem.lag('profit', 'company', 'year', [1, 2])
+    expected = df.chem.lag('profit', 'company', 'year').chem.lag('profit', 'company', 'year', 2)
+    pdt.assert_frame_equal(result, expected)
+
+    result = df.chem.shift('profit', 'company', 'year', [1, -1, -2])
+    expected = (df.chem.lag('profit', 'company', 'year')
+                  .chem.lead('profit', 'company', 'year')
+                  .chem.lead('profit', 'company', 'year', 2))
+    pdt.assert_frame_equal(result, expected)
+    assert list(result.columns[-3:]) == ['profit_lag', 'profit_lead', 'profit_lead2']
+
+
+def test_shift_conflicts_and_invalid_values():
+    df = pd.DataFrame({'company': ['A', 'A'], 'year': [2017, 2018], 'profit': [1, 2], 'profit_lag2': [0, 0]})
+
+    with pytest.raises(ValueError):
+        df.chem.lag('profit', 'company', 'year', [1, 2])
+    with pytest.raises(ValueError):
+        df.chem.lead('profit', 'company', 'year', [1, -1])
+    with pytest.raises(ValueError):
+        df.chem.shift('profit', 'company', 'year', [1, 0])
+    with pytest.raises(TypeError):
+        df.chem.shift('profit', 'company', 'year', [1, 1.5])
+
+    out = df.chem.lag('profit', 'company', 'year', [1, 2], replace=True)
+    assert list(out.columns) == ['company', 'year', 'profit', 'profit_lag', 'profit_lag2']
+    assert out['profit_lag'].tolist()[1] == 1
+    assert out['profit_lag2'].isna().all()
+
+
+def test_set_panel_is_cached_and_invalidated():
+    df = pd.DataFrame({'company': ['A', 'A', 'A', 'B', 'B'],
+                       'year': [2018, 2019, 2020, 2019, 2020],
+                       'profit': [1, 2, 3, 4, 5]})
+
+    assert df.chem.set_panel('company', 'year') is df
+    panel = df.chem._panel[2]
+
+    # The declared panel is reused, also by the frames derived from it
+    out = df.chem.lag('profit')
+    assert out.chem._panel[2] is panel
+    out = out.chem.lead('profit', shift=[1, 2])
+    assert out.chem._panel[2] is panel
+    pdt.assert_frame_equal(out, df.chem.shift('profit', 'company', 'year', [1, -1, -2]))
+
+    # Changing a key column rebuilds the index
+    df.loc[2, 'year'] = 2021
+    out = df.chem.lag('profit')
+    assert df.chem._panel[2] is not panel
+    assert out['profit_lag'].isna().tolist() == [True, False, True, True, False]
+
+
+def test_lag_without_panel_requires_keys():
+    df = pd.DataFrame({'company': ['A'], 'year': [2018], 'profit': [1]})
+
+    with pytest.raises(TypeError):
+        df.chem.lag('profit')
+
+
+def test_inplace_mutate_and_lag():
+    df = pd.DataFrame({'company': ['A', 'A', 'B'], 'year': [2018, 2019, 2019], 'profit': [1, 2, 3]}, index=[10, 11, 12])
+
+    assert df.chem.mutate("company == 'B'", 'profit', 30, inplace=True) is None
+    assert df['profit'].tolist() == [1, 2, 30]
+
+    assert df.chem.lag('profit', 'company', 'year', [1, 2], inplace=True) is None
+    assert list(df.index) == [10, 11, 12]
+    assert df['profit_lag'].isna().tolist() == [True, False, True]
+    assert df['profit_lag'].tolist()[1] == 1
+
+    with pytest.raises(ValueError):
+        df.chem.lag('profit', 'company', 'year', inplace=True)
+    df.chem.lead('profit', 'company', 'year', inplace=True, replace=False)
+    assert df.columns[-1] == 'profit_lead'
+
+    with pytest.raises(TypeError):
+        df.chem.lag('profit', 'company', 'year', replace=True, inplace='yes')
+
+
+def test_inplace_lag_rejects_duplicate_keys():
+    df = pd.DataFrame({'company': ['A', 'A', 'A'], 'year': [2018, 2019, 2019], 'profit': [1, 2, 3]})
+
+    with pytest.raises(ValueError):
+        df.chem.lead('profit', 'company', 'year', inplace=True)
+    assert list(df.columns) == ['company', 'year', 'profit']
+
+
+def test_copy_does_not_modify_original():
+    df = pd.DataFrame({'company': ['A', 'A'], 'year': [2018, 2019], 'profit': [1.0, 2.0], 'assets': [5.0, 6.0]})
+
+    out = df.chem.lag('profit', 'company', 'year')
+    out.loc[0, 'assets'] = 50.0
+    out = df.chem.mutate("year == 2019", 'assets', 60.0)
+    out.loc[0, 'profit'] = 10.0
+
+    assert df['assets'].tolist() == [5.0, 6.0]
+    assert df['profit'].tolist() == [1.0, 2.0]
+    assert out['assets'].tolist() == [5.0, 60.0]
+
+
+def test_chem_case_when():
+    df = pd.DataFrame({'A': [1, 2, 3, 4], 'B': ['x', 'y', 'x', 'y']})
+
+    out = df.chem.case_when('C', [("A > 3", 2), ("B == 'x'", 1)], default=0)
+
+    assert out['C'].tolist() == [1, 0, 1, 2]
+    assert 'C' not in df
+
+
+def test_rolling_matches_windows_in_time():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'firm': rng.integers(0, 20, 300), 'year': rng.integers(2000, 2012, 300)})
+    df['x'] = rng.normal(size=300)
+    df.loc[::7, 'x'] = np.nan
+    df.index = df.index * 2  # the index is kept
+
+    out = df.chem.rolling('x', 'firm', 'year', window=3, stats=['count', 'sum', 'mean', 'std'], min_periods=2)
+
+    pdt.assert_index_equal(out.index, df.index)
+    for i, (firm, year) in zip(df.index, zip(df['firm'], df['year'])):
+        values = df.loc[(df['firm'] == firm) & (df['year'] > year - 3) & (df['year'] <= year), 'x'].dropna()
+        if len(values) < 2:
+            assert out.loc[i, ['x_count3', 'x_sum3', 'x_mean3', 'x_std3']].isna().all()
+            continue
+        assert out.loc[i, 'x_count3'] == len(values)
+        assert out.loc[i, 'x_sum3'] == pytest.approx(values.sum())
+        assert out.loc[i, 'x_mean3'] == pytest.approx(values.mean())
+        assert out.loc[i, 'x_std3'] == pytest.approx(values.std())
+
+
+def test_rolling_gap_breaks_window():
+    df = pd.DataFrame({'firm': ['A'] * 4 + ['B'] * 2, 'year': [2000, 2001, 2003, 2004, 2000, 2001],
+                       'x': [1.0, 2.0, 3.0, 4.0, 10.0, 20.0]})
+
+    out = df.chem.rolling('x', 'firm', 'year', window=2)
+    partial = df.chem.rolling('x', 'firm', 'year', window=2, stats='sum', min_periods=1)
+
+    assert out['x_mean2'].tolist() == pytest.approx([np.nan, 1.5, np.nan, 3.5, np.nan, 15.0], nan_ok=True)
+    assert partial['x_sum2'].tolist() == [1.0, 3.0, 3.0, 7.0, 10.0, 30.0]
+
+
+def test_rolling_empty_windows_with_min_periods_zero():
+    # Unit A has no values; unit B has a hole in 2004 and a missing value in 2007
+    df = pd.DataFrame({'firm': ['A'] * 2 + ['B'] * 6, 'year': [2000, 2001, 2001, 2002, 2003, 2005, 2006, 2007],
+                       'x': [np.nan, np.nan, 8.0, 3.2, -5.7, 2.8, 7.6, np.nan]})
+
+    out = df.chem.rolling('x', 'firm', 'year', window=1, stats=['count', 'sum', 'mean', 'std'], min_periods=0)
+    expected = (df.assign(year=pd.to_datetime(df['year'], format='%Y')).set_index('year')
+                .groupby('firm')['x'].rolling('1D', min_periods=0))
+
+    assert out['x_count1'].tolist() == [0, 0, 1, 1, 1, 1, 1, 0]
+    # Empty windows sum to exactly 0 and have no mean
+    assert out.loc[[0, 1, 7], 'x_sum1'].tolist() == [0.0, 0.0, 0.0]
+    assert out['x_sum1'].tolist() == pytest.approx(expected.sum().tolist())
+    assert out['x_mean1'].tolist() == pytest.approx(expected.mean().tolist(), nan_ok=True)
+    assert out['x_std1'].isna().all()
+
+
+def test_rolling_conflicts_inplace_and_declared_panel():
+    df = pd.DataFrame({'firm': [1, 1, 1], 'year': [2000.0, 2001.0, 2002.0], 'x': [1.0, 2.0, 3.0]})
+    df.chem.set_panel('firm', 'year')
+
+    out = df.chem.rolling('x', window=2, stats=['mean', 'var'])
+    assert out['x_mean2'].tolist() == pytest.approx([np.nan, 1.5, 2.5], nan_ok=True)
+    assert out.chem._panel is df.chem._panel
+
+    with pytest.raises(ValueError):
+        out.chem.rolling('x', window=2)
+    with pytest.raises(ValueError):
+        df.chem.rolling('x', window=2, stats='median')
+
+    assert df.chem.rolling('x', window=3, min_periods=1, inplace=True) is None
+    assert df['x_mean3'].tolist() == [1.0, 1.5, 2.0]
@@ -0,0 +1,108 @@
+import pandas as pd
+import numpy as np
+import pytest
+
+import pychemist
+from pychemist import mutate, expression_cache, ExpressionCache
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'A': [1, 2, 3, 4, 5],
+        'B': ['x', 'y', 'x', 'y', 'z'],
+        'C': [0.5, np.nan, 2.5, -1.0, 3.0],
+        'my col': [True, False, True, True, False],
+    })
+
+
+@pytest.mark.parametrize("query_str", [
+    "A > 2",
+    "A > 2 & B == 'x'",
+    "A > 2 and not C < 1 or B == 'z'",
+    "1 < A <= 4",
+    "B == ['x', 'z']",
+    "B != ['x', 'z']",
+    "A in [1, -3, 5]",
+    "A not in [1, 5]",
+    "`my col` & (A * 2 - 1 >= C)",
+    "A / 2 > C | ~(A % 2 == 0)",
+    "-A < -2",
+    "A.mod(2) == 0",
+    "index > 1",
+])
+def test_expression_cache_matches_eval(df, query_str):
+    cache = ExpressionCache()
+
+    result = pd.Series(cache.evaluate(df, query_str), index=df.index)
+
+    pd.testing.assert_series_equal(result, df.eval(query_str), check_names=False, check_dtype=False)
+
+
+def test_expression_cache_counts_hits_and_misses(df):
+    cache = ExpressionCache(maxsize=2)
+
+    cache.evaluate(df, "A > 2")
+    cache.evaluate(df, "A > 2")
+    cache.evaluate(df.assign(A=df['A'].astype(float)), "A > 2")
+    assert cache.info() == (1, 2, 2, 2)
+
+    # The least recently used expression is evicted
+    cache.evaluate(df, "B == 'x'")
+    cache.evaluate(df.assign(A=df['A'].astype(float)), "A > 2")
+    assert cache.info() == (2, 3, 2, 2)
+    cache.evaluate(df, "A > 2")
+    assert cache.info() == (2, 4, 2, 2)
+
+    cache.clear()
+    assert cache.info() == (0, 0, 2, 0)
+
+
+def test_expression_cache_falls_back_to_eval(df):
+    cache = ExpressionCache()
+
+    assert cache.kind(df, "A.mod(2) == 0") == 'eval'
+    assert cache.kind(df, "B == 'x'") == 'pandas'
+    assert cache.kind(df, "D > 1") == 'eval'
+
+
+def test_mutate_uses_expression_cache(df):
+    expression_cache.clear()
+
+    for chunk in [df, df.copy(), df.iloc[:3]]:
+        mutate(chunk, "A > 2 & B == 'x'", 'D', 1, 0)
+        chunk.chem.mutate("A > 2 & B == 'x'", 'D', 1, 0)
+
+    assert expression_cache.info().misses == 1
+    assert expression_cache.info().hits == 5
+
+
+@pytest.mark.parametrize("query_str", [
+    "A > 2",
+    "1 < A <= 4",
+    "A * 2 - 1 >= C",
+    "A / 2 > C | ~(A % 2 == 0)",
+    "-A < -2",
+    "`my col` & (C > 0)",
+    "A > 2 and not C < 1",
+])
+def test_expression_cache_uses_numexpr(df, query_str):
+    pytest.importorskip("numexpr")
+    cache = ExpressionCache()
+
+    assert cache.kind(df, query_str) == 'numexpr'
+    result = pd.Series(cache.evaluate(df, query_str), index=df.index)
+    pd.testing.assert_series_equal(result, df.eval(query_str), check_names=False, check_dtype=False)
+    pd.testing.assert_frame_equal(df[result], df.query(query_str))
+
+
+@pytest.mark.parametrize("dtype", ['uint64', 'float16'])
+def test_expression_cache_numexpr_unsupported_dtypes(dtype):
+    pytest.importorskip("numexpr")
+    cache = ExpressionCache()
+    values = [0, 3, 2**63 + 5] if dtype == 'uint64' else [0, 3, 1.5]
+    df = pd.DataFrame({'A': np.array(values, dtype=dtype)})
+
+    # numexpr would cast these columns to another dtype, so pandas evaluates them
+    assert cache.kind(df, "A > 2") == 'pandas'
+    assert cache.evaluate(df, "A > 2").tolist() == [False, True, dtype == 'uint64']
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import pychemist  # noqa: F401 (registers the .chem accessor)
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 2000
+    df = pd.DataFrame({
+        'industry': rng.choice(['A', 'B', 'C'], size=n),
+        'year': rng.integers(2000, 2005, size=n).astype(float),
+        'roa': rng.standard_t(2, size=n),
+        'lev': rng.exponential(size=n),
+        'size': rng.integers(0, 1000, size=n),
+    })
+    df.loc[::13, 'roa'] = np.nan
+    df.loc[[5, 6], 'year'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("by", [None, 'year', ['industry', 'year']])
+def test_winsorize_matches_groupby_quantiles(df, by):
+    variables = ['roa', 'lev', 'size']
+    result = df.chem.winsorize(variables, by=by, limits=(0.05, 0.9))
+
+    for var in variables:
+        if by is None:
+            lower, upper = df[var].quantile(0.05), df[var].quantile(0.9)
+        else:
+            grouped = df.groupby(by)[var]
+            lower, upper = grouped.transform('quantile', 0.05), grouped.transform('quantile', 0.9)
+        pdt.assert_series_equal(result[var], df[var].clip(lower, upper).astype(float))
+    assert result.columns.tolist() == df.columns.tolist()
+
+
+def test_winsorize_one_sided_suffix_and_inplace(df):
+    result = df.chem.winsorize('roa', by='year', limits=(None, 0.95), suffix='_w')
+    expected = df['roa'].clip(upper=df.groupby('year')['roa'].transform('quantile', 0.95))
+    pdt.assert_series_equal(result['roa_w'], expected, check_names=False)
+    pdt.assert_series_equal(result['roa'], df['roa'])
+
+    with pytest.raises(ValueError, match="already exist"):
+        result.chem.winsorize('roa', by='year', suffix='_w')
+
+    copy = df.copy()
+    assert copy.chem.winsorize(['roa', 'lev'], by='year', inplace=True) is None
+    pdt.assert_frame_equal(copy, df.chem.winsorize(['roa', 'lev'], by='year'))
+
+
+def test_winsorize_sketch_approximates_quantiles():
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({'year': rng.integers(0, 3, size=300_000), 'x': rng.normal(size=300_000)})
+
+    exact = df.chem.winsorize('x', by='year')
+    approximate = df.chem.winsorize('x', by='year', sketch_size=20_000, seed=0)
+    assert (approximate['x'] - exact['x']).abs().max() < 0.1
+    pdt.assert_frame_equal(approximate, df.chem.winsorize('x', by='year', sketch_size=20_000, seed=0))
+
+
+@pytest.mark.parametrize("by", [None, ['industry', 'year']])
+def test_standardize_matches_groupby(df, by):
+    result = df.chem.standardize(['roa', 'size'], by=by, suffix='_z')
+
+    for var in ['roa', 'size']:
+        if by is None:
+            expected = (df[var] - df[var].mean()) / df[var].std()
+        else:
+            grouped = df.groupby(by)[var]
+            expected = (df[var] - grouped.transform('mean')) / grouped.transform('std')
+        pdt.assert_series_equal(result[var + '_z'], expected, check_names=False, rtol=1e-10)
+
+
+def test_standardize_is_numerically_stable():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'g': np.repeat([0, 1], 500), 'x': 1e9 + rng.normal(size=1000)})
+
+    result = df.chem.standardize('x', by='g', ddof=0)
+    assert result.groupby(df['g'])['x'].std(ddof=0).to_numpy() == pytest.approx([1, 1], rel=1e-6)
+
+
+def test_grouped_errors(df):
+    with pytest.raises(KeyError):
+        df.chem.winsorize('roa', by='missing')
+    with pytest.raises(TypeError, match="numeric"):
+        df.chem.standardize('industry')
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        df.chem.winsorize('roa', limits=(1, 99))
+    with pytest.raises(ValueError, match="above"):
+        df.chem.winsorize('roa', limits=(0.9, 0.1))
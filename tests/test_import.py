@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import pychemist
+
+
+def run(code):
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(pychemist.__file__)))
+    return subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+
+def test_import_does_not_load_scipy_or_statsmodels():
+    out = run(
+        "import sys, pandas as pd, pychemist\n"
+        "pd.DataFrame({'a': [1]}).chem.mutate('a > 0', 'b', 1)\n"
+        "print(sorted(m for m in ('scipy', 'statsmodels') if m in sys.modules))"
+    )
+    assert out.strip() == "[]"
+
+
+def test_lazy_names_load_on_first_use():
+    out = run(
+        "import sys, pychemist\n"
+        "from pychemist import ttest_table\n"
+        "print('scipy' in sys.modules, pychemist.ols_fe.__module__, 'load' in dir(pychemist))"
+    )
+    assert out.split() == ["True", "pychemist.regression", "True"]
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from pychemist import LazyFrame
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'ticker': np.repeat(['A', 'B', 'C', 'D'], 5),
+        'year': np.tile(np.arange(2018, 2023), 4),
+        'x': rng.normal(size=20),
+        'z': rng.normal(size=20),
+        'w': 1.0,
+    })
+    # Shuffled, with gaps
+    return df.sample(frac=1, random_state=1).drop(index=[3, 7])
+
+
+def test_lazy_matches_eager_chain_and_fuses_shifts(panel):
+    original = panel.copy()
+    plan = (panel.chem.lazy()
+            .mutate("x > 0", 'x', 0.0)
+            .lag(['x', 'z'], 'ticker', 'year')
+            .mutate("z < 0", 'flag', 1, 0)
+            .lead('z', 'ticker', 'year', [1, 2])
+            .mutate("x_lag > -1", 'g', 2.0))
+    eager = (panel.chem.mutate("x > 0", 'x', 0.0)
+             .chem.lag(['x', 'z'], 'ticker', 'year')
+             .chem.mutate("z < 0", 'flag', 1, 0)
+             .chem.lead('z', 'ticker', 'year', [1, 2])
+             .chem.mutate("x_lag > -1", 'g', 2.0))
+
+    assert isinstance(plan, LazyFrame)
+    pdt.assert_frame_equal(plan.collect(), eager)
+    pdt.assert_frame_equal(panel, original)
+    assert "2 steps fused" in plan.explain()
+
+
+def test_lazy_does_not_fuse_dependent_shifts(panel):
+    # The lag of a lag, and a lead of a mutated column, need the steps in between
+    plan = (panel.chem.lazy()
+            .lag('x', 'ticker', 'year')
+            .lag('x_lag', 'ticker', 'year')
+            .mutate("z > 0", 'z', 0.0)
+            .lead('z', 'ticker', 'year'))
+    eager = (panel.chem.lag('x', 'ticker', 'year')
+             .chem.lag('x_lag', 'ticker', 'year')
+             .chem.mutate("z > 0", 'z', 0.0)
+             .chem.lead('z', 'ticker', 'year'))
+
+    assert "fused" not in plan.explain()
+    pdt.assert_frame_equal(plan.collect(), eager)
+
+
+def test_lazy_projection_and_skipped_mutations(panel):
+    plan = (panel.chem.lazy()
+            .mutate("x > 0", 'x', 0.0)
+            .lead('z', 'ticker', 'year')
+            .mutate("z < 0", 'flag', 1, 0)
+            .select(['ticker', 'year', 'z_lead', 'flag']))
+    eager = (panel.chem.mutate("x > 0", 'x', 0.0)
+             .chem.lead('z', 'ticker', 'year')
+             .chem.mutate("z < 0", 'flag', 1, 0)[['ticker', 'year', 'z_lead', 'flag']])
+
+    explained = plan.explain()
+    assert "3 of 5 columns: ticker, year, z" in explained
+    assert "skipped   mutate    x = 0.0" in explained
+    pdt.assert_frame_equal(plan.collect(), eager)
+
+
+def test_lazy_pinned_values_and_unknown_names(panel):
+    values = pd.Series(np.arange(len(panel), dtype=float), index=panel.index)
+    # Array values are aligned on the index, and `index` is not a column: neither step may move
+    plan = (panel.chem.lazy()
+            .lag('x', 'ticker', 'year')
+            .mutate("x > 0", 'v', values)
+            .mutate("index > 5", 'u', 1.0)
+            .lead('z', 'ticker', 'year'))
+    eager = (panel.chem.lag('x', 'ticker', 'year')
+             .chem.mutate("x > 0", 'v', values)
+             .chem.mutate("index > 5", 'u', 1.0)
+             .chem.lead('z', 'ticker', 'year'))
+
+    assert "fused" not in plan.explain()
+    pdt.assert_frame_equal(plan.collect(), eager)
+
+
+def test_lazy_duplicate_keys_and_declared_panel(panel):
+    duplicated = pd.concat([panel, panel.iloc[:2]], ignore_index=True)
+    plan = duplicated.chem.lazy().lag('x', 'ticker', 'year').mutate("w > 0", 'c', 1).lead('z', 'ticker', 'year')
+    eager = (duplicated.chem.lag('x', 'ticker', 'year')
+             .chem.mutate("w > 0", 'c', 1)
+             .chem.lead('z', 'ticker', 'year'))
+    pdt.assert_frame_equal(plan.collect(), eager)
+
+    declared = panel.chem.set_panel('ticker', 'year')
+    result = declared.chem.lazy().lag('x').case_when('s', [("x_lag > 0", 'up')], 'down').collect()
+    pdt.assert_frame_equal(result, panel.chem.lag('x', 'ticker', 'year').chem.case_when('s', [("x_lag > 0", 'up')], 'down'))
+    # The result inherits the declared panel
+    assert 'z_lead' in result.chem.lead('z').columns
+
+
+def test_lazy_errors(panel):
+    with pytest.raises(KeyError):
+        panel.chem.lazy().lag('missing', 'ticker', 'year').collect()
+    with pytest.raises(ValueError, match="already exist"):
+        panel.chem.lazy().lag('x', 'ticker', 'year').lag('x', 'ticker', 'year').explain()
+    with pytest.raises(TypeError, match="set_panel"):
+        panel.chem.lazy().lead('x').collect()
+    with pytest.raises(ValueError, match="positive"):
+        panel.chem.lazy().lag('x', 'ticker', 'year', -1)
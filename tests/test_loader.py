@@ -0,0 +1,68 @@
+import importlib.resources
+
+import pandas as pd
+import pytest
+
+from pychemist import datasets, load, table_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    table_cache.clear()
+    yield
+    table_cache.clear()
+
+
+def read_financials(**kwargs):
+    with importlib.resources.files("pychemist.data").joinpath("financials.parquet").open("rb") as f:
+        return pd.read_parquet(f, **kwargs)
+
+
+def test_load_matches_read_parquet_and_is_cached():
+    first = load("financials")
+    first.loc[0, 'net_income'] = -1.0  # changing the result doesn't change the cache
+
+    pd.testing.assert_frame_equal(load("financials"), read_financials())
+    assert table_cache.info().hits == 1 and table_cache.info().misses == 1
+
+
+@pytest.mark.parametrize("warm", [False, True])
+def test_load_columns_and_filters(warm):
+    if warm:
+        load("financials")  # projections and filters are then applied to the cached table
+    filters = [('year', '>=', 2020)]
+
+    result = load("financials", columns=['ticker', 'revenue'], filters=filters)
+
+    expected = read_financials(columns=['ticker', 'revenue'], filters=filters)
+    pd.testing.assert_frame_equal(result.reset_index(drop=True), expected.reset_index(drop=True))
+    assert list(result.columns) == ['ticker', 'revenue']
+
+
+def test_cache_is_bounded():
+    table_cache.maxbytes = 1
+    try:
+        load("financials")
+        assert table_cache.info().currsize == 0
+    finally:
+        table_cache.maxbytes = 512 * 2 ** 20
+
+
+@pytest.mark.parametrize("disk_cache", [False, True])
+def test_register_local_dataset(tmp_path, monkeypatch, disk_cache):
+    monkeypatch.setenv("PYCHEMIST_CACHE_DIR", str(tmp_path / "cache"))
+    df = pd.DataFrame({'ticker': ['A', 'B', 'C'], 'year': [2020, 2021, 2022], 'x': [1.0, 2.0, 3.0]})
+    df.to_parquet(tmp_path / "local.parquet", index=False)
+
+    datasets.register("local", tmp_path / "local.parquet", disk_cache=disk_cache)
+    try:
+        assert "local" in datasets
+        pd.testing.assert_frame_equal(load("local"), df)
+        subset = load("local", columns=['x'], filters=[('year', '>', 2020)])
+        pd.testing.assert_frame_equal(subset, df.loc[1:, ['x']].reset_index(drop=True))
+        assert (tmp_path / "cache").exists() == disk_cache
+    finally:
+        datasets.unregister("local")
+
+    with pytest.raises(ValueError):
+        load("local")
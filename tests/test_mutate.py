@@ -2,7 +2,7 @@ import pandas as pd
 import numpy as np
 import pytest
 
-from pychemist import mutate
+from pychemist import mutate, case_when
 
 def test_mutate_basic():
     df = pd.DataFrame({
@@ -51,4 +51,84 @@ def test_mutate_invalid_inplace():
     df = pd.DataFrame({'A': [1]})
 
     with pytest.raises(TypeError):
-        mutate(df, "A == 1", 'A', 10, inplace="yes")
\ No newline at end of file
+        mutate(df, "A == 1", 'A', 10, inplace="yes")
+
+def test_mutate_duplicate_index_labels():
+    df = pd.DataFrame({
+        'A': [1, 2, 3, 4],
+        'B': ['x', 'y', 'x', 'y']
+    }, index=[0, 0, 1, 1])
+
+    result = mutate(df, "B == 'x'", 'A', 10, other=0)
+
+    expected = [10, 0, 10, 0]
+    assert (result['A'] == expected).all()
+
+def test_mutate_series_value_and_missing_condition():
+    df = pd.DataFrame({
+        'A': [1.0, np.nan, 3.0, 4.0],
+        'B': [1, 2, 3, 4]
+    })
+
+    result = mutate(df, "A > 2", 'C', df['B'] * 10)
+
+    assert result['C'].isna().tolist() == [True, True, False, False]
+    assert result['C'].tolist()[2:] == [30, 40]
+
+def test_mutate_values_for_matching_rows():
+    df = pd.DataFrame({
+        'A': [1, 2, 3, 4],
+        'B': [1, 2, 3, 4]
+    })
+
+    # Arrays with one entry per matching (or non-matching) row fill those rows in order
+    result = mutate(df, "A > 2", 'C', np.array([30, 40]))
+    assert result['C'].isna().tolist() == [True, True, False, False]
+    assert result['C'].tolist()[2:] == [30, 40]
+
+    result = mutate(df, "A > 2", 'B', [30, 40], other=[-1, -2])
+    assert result['B'].tolist() == [-1, -2, 30, 40]
+    assert result['B'].dtype == df['B'].dtype
+
+    with pytest.raises(ValueError, match="one entry per selected row"):
+        mutate(df, "A > 2", 'C', [1, 2, 3])
+    with pytest.raises(ValueError, match="`other` has 3 entries"):
+        mutate(df, "A > 2", 'C', 1, other=[1, 2, 3])
+
+def test_case_when_first_match_wins():
+    df = pd.DataFrame({
+        'A': [1, 5, 20, 50],
+        'B': ['x', 'y', 'x', 'y']
+    })
+
+    result = case_when(df, 'size', [("A >= 10", 'large'), ("A >= 5", 'mid'), ("B == 'x'", 'small_x')], default='small')
+
+    assert result['size'].tolist() == ['small_x', 'mid', 'large', 'large']
+    assert 'size' not in df
+
+def test_case_when_keeps_current_values_without_default():
+    df = pd.DataFrame({
+        'A': [1, 2, 3, 4],
+        'B': ['x', 'y', 'x', 'y']
+    })
+
+    ret = case_when(df, 'A', [("B == 'x'", 0), ("A == 4", -1)], inplace=True)
+
+    assert ret is None
+    assert df['A'].tolist() == [0, 2, 0, -1]
+
+def test_case_when_values_for_matching_rows():
+    df = pd.DataFrame({
+        'A': [1, 5, 20, 50],
+        'B': ['x', 'y', 'x', 'y']
+    })
+
+    result = case_when(df, 'C', [("A >= 10", np.array([10, 11])), ("B == 'x'", [0, 1])], default=['d'])
+
+    assert result['C'].tolist() == [0, 'd', 10, 11]
+
+def test_case_when_invalid_caselist():
+    df = pd.DataFrame({'A': [1]})
+
+    with pytest.raises(TypeError):
+        case_when(df, 'A', ("A == 1", 2))
@@ -0,0 +1,63 @@
+import pandas as pd
+import numpy as np
+import pandas.testing as pdt
+import pytest
+
+from pychemist import time_shift
+from pychemist.panel import PanelIndex
+
+
+def merge_shift(dataframe, variables, id, time, shift):
+    # Reference implementation: the hash merge previously used by time_shift
+    suffix = (f'_lag{shift}' if shift > 1 else '_lag') if shift > 0 else (f'_lead{-shift}' if shift < -1 else '_lead')
+    df_lag = dataframe[[time] + [id] + variables].copy()
+    df_lag[time] = df_lag[time] + shift
+    return pd.merge(dataframe, df_lag, how="left", left_on=[id, time], right_on=[id, time], suffixes=['', suffix])
+
+
+def random_panel(seed, n=300, duplicates=True, float_time=False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'firm': rng.choice(['a', 'b', 'c', 'd', None], size=n),
+        'year': rng.integers(2000, 2012, size=n),
+        'x': rng.normal(size=n),
+        'n': rng.integers(0, 100, size=n),
+        'flag': rng.integers(0, 2, size=n).astype(bool),
+    }, index=rng.permutation(n))
+    if not duplicates:
+        df = df.drop_duplicates(['firm', 'year'])
+    if float_time:
+        df['year'] = df['year'].astype(float)
+        df.loc[df.index[::17], 'year'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("shift", [1, 2, 5, -1, -3])
+@pytest.mark.parametrize("duplicates", [False, True])
+@pytest.mark.parametrize("float_time", [False, True])
+def test_time_shift_matches_merge(shift, duplicates, float_time):
+    df = random_panel(shift + 10, duplicates=duplicates, float_time=float_time)
+
+    result = time_shift(df, ['x', 'n', 'flag'], 'firm', 'year', shift)
+    expected = merge_shift(df, ['x', 'n', 'flag'], 'firm', 'year', shift)
+
+    pdt.assert_frame_equal(result, expected)
+
+
+def test_time_shift_empty_frame():
+    df = pd.DataFrame({'firm': pd.Series([], dtype=object), 'year': pd.Series([], dtype=int), 'x': pd.Series([], dtype=float)})
+
+    result = time_shift(df, ['x'], 'firm', 'year')
+
+    assert list(result.columns) == ['firm', 'year', 'x', 'x_lag']
+    assert len(result) == 0
+
+
+def test_panel_index_shift_indexer():
+    panel = PanelIndex(['a', 'a', 'a', 'b'], [2001, 2000, 2003, 2000])
+
+    rows, takers = panel.shift_indexer([1, -1])
+
+    assert rows is None
+    assert list(takers[0]) == [1, -1, -1, -1]
+    assert list(takers[1]) == [-1, 0, -1, -1]
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pychemist  # noqa: F401 (registers the .chem accessor)
+from pychemist.parallel import n_workers
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'ticker': np.repeat(np.arange(50), 8).astype(str), 'year': np.tile(np.arange(2000, 2008), 50)})
+    df = df[rng.random(len(df)) > 0.2].sample(frac=1, random_state=0)
+    df['x'] = rng.normal(size=len(df))
+    df.loc[df.index[::9], 'x'] = np.nan
+    return df
+
+
+def test_parallel_matches_serial_exactly(panel):
+    shifted = panel.chem.shift(['x'], 'ticker', 'year', [1, 2, -1], n_jobs=3)
+    rolled = panel.chem.rolling('x', 'ticker', 'year', window=3, stats=['sum', 'std'], min_periods=1, n_jobs=3)
+
+    pd.testing.assert_frame_equal(shifted, panel.chem.shift(['x'], 'ticker', 'year', [1, 2, -1]), check_exact=True)
+    pd.testing.assert_frame_equal(rolled, panel.chem.rolling('x', 'ticker', 'year', window=3, stats=['sum', 'std'],
+                                                             min_periods=1), check_exact=True)
+
+
+def test_parallel_duplicate_keys_fall_back_to_serial(panel):
+    df = pd.concat([panel, panel.iloc[:3]])
+
+    pd.testing.assert_frame_equal(df.chem.lag('x', 'ticker', 'year', n_jobs=2), df.chem.lag('x', 'ticker', 'year'))
+
+
+def test_n_workers():
+    assert n_workers(None, 10) == 1
+    assert n_workers(4, 2) == 2
+    assert n_workers(-1, 10 ** 6) >= 1
+    with pytest.raises(ValueError):
+        n_workers(0, 10)
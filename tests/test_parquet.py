@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pychemist import time_shift_parquet
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'ticker': np.repeat(np.arange(40), 6), 'year': np.tile(np.arange(2000, 2006), 40)})
+    df = df[rng.random(len(df)) > 0.2]
+    df = pd.concat([df, df.iloc[[5, 17]]]).sort_values('ticker', kind='stable')  # duplicate keys
+    df['x'] = rng.normal(size=len(df))
+    df['n'] = rng.integers(0, 100, size=len(df))
+    return df.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 10_000])
+def test_time_shift_parquet_matches_in_memory(panel, tmp_path, batch_size):
+    source = tmp_path / "source"
+    source.mkdir()
+    for i, rows in enumerate(np.array_split(np.arange(len(panel)), 3)):
+        panel.iloc[rows].to_parquet(source / f"part-{i}.parquet", index=False)
+
+    rows = time_shift_parquet(str(source), str(tmp_path / "out.parquet"), ['x', 'n'], 'ticker', 'year',
+                              [1, -2], batch_size=batch_size)
+
+    expected = panel.chem.shift(['x', 'n'], 'ticker', 'year', [1, -2])
+    result = pd.read_parquet(tmp_path / "out.parquet")
+    assert rows == len(result)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert str(pd.read_parquet(tmp_path / "out.parquet", dtype_backend="pyarrow")['n_lag'].dtype) == 'int64[pyarrow]'
+
+
+def test_time_shift_parquet_requires_sorted_ids(panel, tmp_path):
+    panel.sample(frac=1, random_state=0).to_parquet(tmp_path / "in.parquet", index=False)
+
+    with pytest.raises(ValueError, match="sorted"):
+        time_shift_parquet(str(tmp_path / "in.parquet"), str(tmp_path / "out.parquet"), ['x'], 'ticker', 'year',
+                           batch_size=50)
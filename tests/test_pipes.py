@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pychemist import convert_pipe_list, split_pipe
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        'ids': ['1|2|3', '', None, '2||4', '3'],
+        'x': np.arange(5, dtype=float),
+    }, index=list('abcde'))
+
+
+def test_split_pipe_list_matches_convert_pipe_list(df):
+    result = split_pipe(df['ids'])
+
+    assert result.index.equals(df.index) and result.name == 'ids'
+    assert result.isna().tolist() == [False, False, True, False, False]
+    for value, parsed in zip(df['ids'], result):
+        if pd.notna(value):
+            assert parsed == convert_pipe_list(value)
+
+
+def test_split_pipe_infers_type_per_column():
+    assert split_pipe(pd.Series(['1|2', '3'])).iloc[0] == [1, 2]
+    # One non-integer element makes every element a string
+    assert split_pipe(pd.Series(['1|2', 'a'])).iloc[0] == ['1', '2']
+
+
+def test_split_pipe_explode(df):
+    result = split_pipe(df['ids'], 'explode')
+
+    assert result.index.tolist() == ['a', 'a', 'a', 'd', 'd', 'e']
+    assert result.tolist() == [1, 2, 3, 2, 4, 3]
+
+
+def test_split_pipe_indicators(df):
+    result = split_pipe(pd.Series(['b|a|b', None, 'c']), 'indicators', prefix='tag')
+
+    assert result.columns.tolist() == ['tag_a', 'tag_b', 'tag_c']
+    assert isinstance(result.dtypes.iloc[0], pd.SparseDtype)
+    assert result.sparse.to_dense().astype(int).values.tolist() == [[1, 1, 0], [0, 0, 0], [0, 0, 1]]
+
+
+def test_split_pipe_categorical(df):
+    tags = df['ids'].astype('category')
+
+    assert split_pipe(tags).tolist()[:2] == [[1, 2, 3], []]
+    pd.testing.assert_series_equal(split_pipe(tags, 'explode'), split_pipe(df['ids'], 'explode'))
+    assert split_pipe(tags, 'indicators').columns.tolist() == [1, 2, 3, 4]
+
+def test_split_pipe_custom_separator_and_errors():
+    assert split_pipe(pd.Series(['x;y']), sep=';').iloc[0] == ['x', 'y']
+    with pytest.raises(ValueError, match="Unknown output"):
+        split_pipe(pd.Series(['1']), 'wide')
+    with pytest.raises(TypeError, match="The values need to contain strings"):
+        split_pipe(pd.Series([1, 2]))
+    with pytest.raises(TypeError, match="The variable `n` needs to contain strings"):
+        split_pipe(pd.Series([1, 2], dtype='category', name='n'))
+
+
+def test_accessor_split_pipe(df):
+    listed = df.chem.split_pipe('ids')
+    assert listed.columns.tolist() == ['ids', 'x'] and listed['ids'].iloc[0] == [1, 2, 3]
+    assert df['ids'].iloc[0] == '1|2|3'
+
+    long = df.chem.split_pipe('ids', 'explode')
+    assert long.index.tolist() == ['a', 'a', 'a', 'd', 'd', 'e']
+    assert long['x'].tolist() == [0, 0, 0, 3, 3, 4] and long['ids'].tolist() == [1, 2, 3, 2, 4, 3]
+
+    wide = df.chem.split_pipe('ids', 'indicators')
+    assert wide.columns.tolist() == ['x', 'ids_1', 'ids_2', 'ids_3', 'ids_4']
+    assert wide['ids_2'].sparse.to_dense().tolist() == [True, False, False, True, False]
+
+    with pytest.raises(KeyError):
+        df.chem.split_pipe('missing')
+    with pytest.raises(ValueError, match="already exist"):
+        df.assign(ids_1=0).chem.split_pipe('ids', 'indicators')
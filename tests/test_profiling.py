@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pychemist
+from pychemist import Profile
+
+
+@pytest.fixture
+def panel():
+    return pd.DataFrame({
+        'ticker': np.repeat(['A', 'B', 'C'], 4),
+        'year': np.tile([2020, 2021, 2022, 2023], 3),
+        'x': np.arange(12, dtype=float),
+    })
+
+
+def test_profile_records_operations_and_phases(panel):
+    with Profile() as profile:
+        pychemist.time_shift(panel, ['x'], 'ticker', 'year')
+        panel.chem.lag('x', 'ticker', 'year', [1, 2])
+        panel.chem.mutate("x > 5", 'y', 1.0)
+    panel.chem.lead('x', 'ticker', 'year')  # after the profile: not recorded
+
+    assert [record['operation'] for record in profile.records] == ['time_shift', 'chem.lag', 'chem.mutate']
+    lag = profile.records[1]
+    assert (lag['rows'], lag['columns'], lag['output_rows'], lag['output_columns']) == (12, 3, 12, 5)
+    assert {'conflict check', 'index', 'shift', 'copy', 'assign'} <= set(lag['phases'])
+    assert sum(lag['phases'].values()) <= lag['seconds']
+    # The module-level mutate called by the accessor is part of the accessor's record
+    assert set(profile.records[2]['phases']) == {'copy', 'condition', 'assign'}
+
+    summary = profile.summary()
+    assert summary.loc['chem.lag', 'calls'] == 1 and summary.loc['time_shift', 'rows'] == 12
+    assert json.loads(profile.to_json())['operations'][0]['operation'] == 'time_shift'
+
+
+def test_profile_callback_memory_and_inplace(panel):
+    seen = []
+    with Profile(callback=seen.append, memory=True) as profile:
+        panel.chem.lag('x', 'ticker', 'year', inplace=True)
+        pychemist.ttest_table(panel.assign(treated=panel['x'] > 5), 'x', 'treated')
+
+    assert seen == profile.records
+    assert seen[0]['output_columns'] == 4 and seen[0]['peak_bytes'] > 0
+    assert set(seen[1]['phases']) == {'aggregate', 'test'}
+
+
+def test_failed_calls_are_not_recorded(panel):
+    with Profile() as profile:
+        with pytest.raises(KeyError):
+            panel.chem.lag('missing', 'ticker', 'year')
+    assert profile.records == []
@@ -0,0 +1,143 @@
+import warnings
+
+import pandas as pd
+import numpy as np
+import pytest
+import statsmodels.formula.api as smf
+
+from pychemist import ols_fe, summary_no_fe
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 600
+    df = pd.DataFrame({
+        'firm': rng.integers(0, 30, size=n),
+        'year': rng.integers(2000, 2006, size=n),
+        'x': rng.normal(size=n),
+        'z': rng.normal(size=n),
+    })
+    df['y'] = 2 * df['x'] - df['z'] + 0.1 * df['firm'] + 0.3 * (df['year'] - 2000) + rng.normal(size=n)
+    df.loc[3, 'x'] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("absorb", [['firm'], ['firm', 'year']])
+def test_ols_fe_matches_dummies(df, absorb):
+    dummies = " + ".join(f"C({var})" for var in absorb)
+    model = smf.ols(f"y ~ x + z + {dummies}", df).fit()
+
+    result = ols_fe("y ~ x + z", df, absorb)
+
+    pd.testing.assert_series_equal(result.params, model.params[['x', 'z']], check_names=False)
+    pd.testing.assert_series_equal(result.bse, model.bse[['x', 'z']], check_names=False)
+    pd.testing.assert_series_equal(result.pvalues, model.pvalues[['x', 'z']], check_names=False)
+    assert result.df_resid == model.df_resid
+    assert result.nobs == model.nobs
+    assert result.rsquared == pytest.approx(model.rsquared)
+
+
+def test_ols_fe_clustered_matches_dummies(df):
+    data = df.dropna()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = smf.ols("y ~ x + z + C(firm) + C(year)", data).fit(cov_type='cluster', cov_kwds={'groups': data['firm']})
+
+    result = ols_fe("y ~ x + z", df, ['firm', 'year'], cluster='firm')
+
+    pd.testing.assert_series_equal(result.bse, model.bse[['x', 'z']], check_names=False)
+    pd.testing.assert_series_equal(result.pvalues, model.pvalues[['x', 'z']], check_names=False)
+    assert result.n_clusters == 30
+
+
+def test_ols_fe_summary_no_fe(df):
+    result = ols_fe("y ~ x + z", df, 'firm')
+
+    text = summary_no_fe(result)
+
+    assert "Absorbed FE:" in text and "firm (30)" in text
+    lines = [line.split()[0] for line in text.split('\n') if line.startswith(('x ', 'z '))]
+    assert lines == ['x', 'z']
+
+
+def test_ols_fe_omits_collinear_variables(df):
+    df['size'] = df['firm'] * 2.0
+
+    with pytest.warns(UserWarning, match="size"):
+        result = ols_fe("y ~ x + size", df, 'firm')
+
+    assert list(result.params.index) == ['x']
+
+
+def test_summary_no_fe_drops_dummies(df):
+    model = smf.ols("y ~ x + C(firm)", df).fit()
+
+    text = summary_no_fe(model)
+
+    assert "C(firm)" not in text
+    assert "Intercept" in text
+
+
+def test_summary_no_fe_drops_interactions(df):
+    model = smf.ols("y ~ x + z + C(firm) + x:C(year)", df).fit()
+
+    text = summary_no_fe(model)
+
+    assert "C(firm)" not in text and "C(year)" not in text
+    rows = {line.split()[0]: float(line.split()[1]) for line in text.split('\n') if line.startswith(('x ', 'z '))}
+    assert rows == pytest.approx(model.params[['x', 'z']].round(4).to_dict())
+
+
+def test_summary_no_fe_custom_pattern(df):
+    df['firm'] = 'f' + df['firm'].astype(str)
+    model = smf.ols("y ~ x + firm", df).fit()
+
+    assert "firm[T." in summary_no_fe(model)
+    text = summary_no_fe(model, pattern=r"^firm\[")
+
+    assert "firm[T." not in text
+    assert "Intercept" in text and "No. Observations:" in text
+
+
+def test_summary_no_fe_formats_selected_rows_only(df, monkeypatch):
+    model = smf.ols("y ~ x + C(firm)", df).fit()
+    full_text = model.summary().as_text()
+
+    # The coefficient table is built from the kept rows; the full summary is never rendered
+    def full_summary(*args, **kwargs):
+        raise AssertionError("the full summary was rendered")
+
+    monkeypatch.setattr(model, "summary", full_summary)
+    text = summary_no_fe(model)
+
+    assert "C(firm)" not in text
+    # The diagnostics are those of the full model
+    cond_no = full_text.split("Cond. No.")[1].split()[0]
+    assert text.split("Cond. No.")[1].split()[0] == cond_no
+
+
+def test_summary_no_fe_falls_back_to_text_filter():
+    class Summary:
+        def as_text(self):
+            return "x      1.0\nC(firm)[T.1]      2.0\nfooter"
+
+    class Results:
+        params = bse = tvalues = pvalues = pd.Series([1.0, 2.0], index=['x', 'C(firm)[T.1]'])
+
+        # No `xname` argument, as in results classes without table support
+        def summary(self, alpha=0.05):
+            return Summary()
+
+    assert summary_no_fe(Results()) == "x      1.0\nfooter"
+
+
+def test_summary_no_fe_raises_real_errors(df, monkeypatch):
+    model = smf.ols("y ~ x + C(firm)", df).fit()
+
+    def broken_conf_int(self, alpha=0.05):
+        raise ValueError("broken")
+
+    monkeypatch.setattr("pychemist.regression._SelectedParams.conf_int", broken_conf_int)
+    with pytest.raises(ValueError, match="broken"):
+        summary_no_fe(model)
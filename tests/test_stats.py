@@ -0,0 +1,132 @@
+import pandas as pd
+import numpy as np
+import pytest
+from scipy.stats import ttest_ind
+
+from pychemist import ttest, ttest_table, TTestAccumulator
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        'x': rng.normal(size=n),
+        'y': rng.exponential(size=n),
+        'treated': rng.integers(0, 2, size=n),
+        'post': rng.choice([0, 1, 2], size=n),
+    })
+
+
+@pytest.mark.parametrize("equal_var", [True, False])
+def test_ttest_table_matches_scipy(df, equal_var):
+    result = ttest_table(df, ['x', 'y'], ['treated', 'post'], equal_var=equal_var)
+
+    assert list(result[['treatment', 'variable']].itertuples(index=False, name=None)) == [
+        ('treated', 'x'), ('treated', 'y'), ('post', 'x'), ('post', 'y')]
+    for row in result.itertuples():
+        group1 = df.loc[df[row.treatment] == 1, row.variable]
+        group0 = df.loc[df[row.treatment] == 0, row.variable]
+        t, p = ttest_ind(group1, group0, equal_var=equal_var)
+        assert row.n_1 == len(group1) and row.n_0 == len(group0)
+        assert row.mean_1 == pytest.approx(group1.mean())
+        assert row.diff == pytest.approx(group1.mean() - group0.mean())
+        assert row.t == pytest.approx(t)
+        assert row.p == pytest.approx(p)
+
+
+def test_ttest_table_drops_missing_values(df):
+    df.loc[:9, 'x'] = np.nan
+
+    result = ttest_table(df, 'x', 'treated')
+
+    valid = df.dropna(subset=['x'])
+    t, p = ttest_ind(valid.loc[valid['treated'] == 1, 'x'], valid.loc[valid['treated'] == 0, 'x'])
+    assert result.loc[0, 'n_1'] + result.loc[0, 'n_0'] == len(valid)
+    assert result.loc[0, 't'] == pytest.approx(t)
+
+
+def test_ttest_table_missing_column(df):
+    with pytest.raises(KeyError):
+        ttest_table(df, ['x', 'z'], 'treated')
+
+
+def test_ttest_prints_summary(df, capsys):
+    ttest(df, 'x', 'treated')
+
+    t, p = ttest_ind(df.loc[df['treated'] == 1, 'x'], df.loc[df['treated'] == 0, 'x'])
+    out = capsys.readouterr().out
+    assert out.startswith("T-test for x, grouped by treated:")
+    assert f"T-value: {t:.3f}" in out
+    assert f"Signficance: {p:.3f}" in out
+
+
+@pytest.mark.parametrize("equal_var", [True, False])
+def test_accumulator_matches_ttest_table(df, equal_var):
+    df.loc[::7, 'y'] = np.nan
+    expected = ttest_table(df, ['x', 'y'], ['treated', 'post'], equal_var=equal_var)
+
+    # Chunks of uneven size, split over two accumulators and merged
+    chunks = [df.iloc[:1], df.iloc[1:123], df.iloc[123:300], df.iloc[300:]]
+    first = TTestAccumulator(['x', 'y'], ['treated', 'post']).update(chunks[:2])
+    second = TTestAccumulator(['x', 'y'], ['treated', 'post']).update(iter(chunks[2:]))
+    result = first.merge(second).result(equal_var=equal_var)
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9)
+
+
+def test_accumulator_is_numerically_stable():
+    rng = np.random.default_rng(1)
+    x = 1e6 + rng.normal(size=10_000)
+    df = pd.DataFrame({'x': x, 'treated': rng.integers(0, 2, size=len(x))})
+
+    acc = TTestAccumulator('x', 'treated')
+    for start in range(0, len(df), 100):
+        acc.update(df.iloc[start:start + 100])
+
+    # A naive sum of squares would lose all precision on this offset
+    centered = x - 1e6
+    t, p = ttest_ind(centered[df['treated'] == 1], centered[df['treated'] == 0])
+    assert acc.result().loc[0, 't'] == pytest.approx(t, rel=1e-6)
+
+
+def test_accumulator_merge_requires_same_columns():
+    with pytest.raises(ValueError):
+        TTestAccumulator('x', 'treated').merge(TTestAccumulator('y', 'treated'))
+
+
+@pytest.mark.parametrize("method", ["permutation", "bootstrap"])
+def test_ttest_table_resampling_p_values(df, method):
+    df.loc[::11, 'y'] = np.nan
+    parametric = ttest_table(df, ['x', 'y'], 'treated')
+    result = ttest_table(df, ['x', 'y'], 'treated', method=method, n_resamples=2000, seed=3)
+
+    # Same statistics, with a p-value close to the parametric one on these well-behaved samples
+    pd.testing.assert_frame_equal(result.drop(columns='p'), parametric.drop(columns='p'))
+    assert result['p'].to_numpy() == pytest.approx(parametric['p'].to_numpy(), abs=0.05)
+    assert ((result['p'] > 0) & (result['p'] <= 1)).all()
+
+    # Reproducible for a seed; the block size and the workers don't change the resamples
+    again = ttest_table(df, ['x', 'y'], 'treated', method=method, n_resamples=2000, seed=3, n_jobs=2)
+    pd.testing.assert_frame_equal(result, again)
+    small_blocks = ttest_table(df, ['x', 'y'], 'treated', method=method, n_resamples=2000, seed=3, max_memory=10_000)
+    assert small_blocks['p'].to_numpy() == pytest.approx(parametric['p'].to_numpy(), abs=0.05)
+
+
+def test_ttest_permutation_detects_a_shift():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'x': rng.standard_t(2, size=400), 'treated': np.repeat([0, 1], 200)})
+    df.loc[df['treated'] == 1, 'x'] += 1.0
+
+    result = ttest_table(df, 'x', 'treated', method='permutation', n_resamples=999, seed=0)
+    assert result.loc[0, 'p'] == pytest.approx(1 / 1000)
+
+
+def test_ttest_resampling_arguments(df, capsys):
+    ttest(df, 'x', 'treated', method='permutation', n_resamples=99, seed=0)
+    assert "Signficance (permutation, 99 resamples):" in capsys.readouterr().out
+
+    with pytest.raises(ValueError, match="Unknown method"):
+        ttest_table(df, 'x', 'treated', method='exact')
+    with pytest.raises(ValueError, match="n_resamples"):
+        ttest_table(df, 'x', 'treated', method='bootstrap', n_resamples=0)